@@ -1,159 +1,120 @@
 import pygame
-import random
-import math
 import sys
 
-# Stałe
-WIDTH, HEIGHT = 800, 600  # size of the window
-PARTICLE_RADIUS = 5  # Particle radius [px]
-DT = 1.0  # time delta [s]
-CELL_SIZE = 4 * PARTICLE_RADIUS  # cell size = 2* particle diameter for optimal results
-GRID_W = (WIDTH  + CELL_SIZE - 1) // CELL_SIZE
-GRID_H = (HEIGHT + CELL_SIZE - 1) // CELL_SIZE
-
-class Particle:
-    def __init__(self, x, y, vx, vy):
-        self.x = x
-        self.y = y
-        self.vx = vx
-        self.vy = vy
-
-    def update_position(self): # changing position s=vt
-        self.x += self.vx * DT
-        self.y += self.vy * DT
-
-    def check_walls(self): # bouncing off the walls
-        if self.x - PARTICLE_RADIUS < 0 or self.x + PARTICLE_RADIUS > WIDTH:
-            self.vx = -self.vx
-            self.x = max(PARTICLE_RADIUS, min(self.x, WIDTH - PARTICLE_RADIUS))
-        if self.y - PARTICLE_RADIUS < 0 or self.y + PARTICLE_RADIUS > HEIGHT:
-            self.vy = -self.vy
-            self.y = max(PARTICLE_RADIUS, min(self.y, HEIGHT - PARTICLE_RADIUS))
-
-    def collide_with(self, other): # collisions between particles
-        dx = other.x - self.x
-        dy = other.y - self.y
-        dist2 = dx * dx + dy * dy # optimisation, sqrt is demanding
-        if dist2 >= 4 * PARTICLE_RADIUS * PARTICLE_RADIUS:
-            return  # lack of collision
-
-        dist = math.sqrt(dist2)
-
-        # unit vector along collision line
-        nx = dx / dist
-        ny = dy / dist
-
-        # relative speed
-        dvx = self.vx - other.vx
-        dvy = self.vy - other.vy
-
-        # component of relative speed along collision line
-        dvn = dvx * nx + dvy * ny
-        if dvn > 0:  # particles are getting further from each other
-            return
-
-        # for equal masses: changing component along nx, ny
-        # (it can be written as v1' = v1 - dvn*n, v2' = v2 + dvn*n)
-        impulse = dvn  # 2 * dvn / (m1+m2)  → when m1=m2 = 1
-        self.vx -= impulse * nx
-        self.vy -= impulse * ny
-        other.vx += impulse * nx
-        other.vy += impulse * ny
-
-        # ----- separating particles, so they wouldn't glue together -----
-        overlap = 2 * PARTICLE_RADIUS - dist
-        if overlap > 0:
-            sep = overlap / 2.0
-            self.x -= sep * nx
-            self.y -= sep * ny
-            other.x += sep * nx
-            other.y += sep * ny
-
-def simulate(num_particles, max_speed):
+from symulator.config import WIDTH, HEIGHT, HEATMAP_THRESHOLD
+from symulator.engine import Simulation
+from symulator.observables import SpeedHistogram
+from symulator.profiling import StepProfiler
+from symulator.render import HeatmapRenderer, draw_speed_histogram, make_renderer
+from symulator.replay import ReplayCursor
+from symulator.ring import PhysicsProcess
+from symulator.threaded import PhysicsThread
+from symulator.trajectory import Trajectory
+
+
+def simulate(num_particles, max_speed, heatmap_threshold=HEATMAP_THRESHOLD,
+             threaded=False, process=False, physics_rate=None, steps_per_frame=1,
+             profile_path=None, placement="auto", seed=None):
+    if profile_path and (threaded or process):
+        raise ValueError("profile_path needs the physics in the drawing loop, "
+                         "not threaded or process")
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Symulacja zderzeń cząstek gazu 2D - Siatka + licznik energii")
     clock = pygame.time.Clock()
     font = pygame.font.SysFont("Arial", 18)
-
-    particles = []
-    for _ in range(num_particles):
-        x = random.uniform(PARTICLE_RADIUS, WIDTH - PARTICLE_RADIUS)
-        y = random.uniform(PARTICLE_RADIUS, HEIGHT - PARTICLE_RADIUS)
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(1, max_speed)  # Velocity from 1 to max_speed
-        vx = speed * math.cos(angle)
-        vy = speed * math.sin(angle)
-        particles.append(Particle(x, y, vx, vy))
-
-    # Spatial grid: list of lists (every cell is list of particles indexes)
-    grid = [[[] for _ in range(GRID_H)] for _ in range(GRID_W)]
+    # one pre-rendered circle per colour drawn with a single blits call, or a
+    # density heatmap above heatmap_threshold particles (H switches to mean speed)
+    renderer = make_renderer(num_particles, heatmap_threshold).convert()
+
+    profile_file = open(profile_path, "w", newline="") if profile_path else None
+    # phase timings for the HUD (P) and the optional CSV, only when the
+    # physics runs in this loop (the other modes reject profile_path)
+    profiler = None if threaded or process else StepProfiler(profile_file)
+    show_hud = False
+    # speed histogram against Maxwell-Boltzmann (M), from the drawn speeds
+    histogram = SpeedHistogram(2.5 * max_speed)
+    show_histogram = False
+
+    # Physics lives in the headless engine, this loop only draws it.
+    # threaded / process: physics steps in a background thread / process at
+    # physics_rate batches per second (None = as fast as it can) and every
+    # frame draws the newest batch; placement="auto" starts without overlaps
+    # (Poisson-disc sampling, a hex lattice when that is too dense, which is
+    # the case for the default 3000 particles: they start as a crystal that
+    # melts within the first frames) and the same seed gives the same run
+    if process:
+        sim = physics = PhysicsProcess(num_particles, max_speed, physics_rate, steps_per_frame,
+                                       placement=placement, seed=seed)
+    else:
+        sim = Simulation(num_particles, max_speed, profiler=profiler, placement=placement,
+                         seed=seed)
+        physics = PhysicsThread(sim, physics_rate, steps_per_frame) if threaded else None
+        if physics is not None:
+            physics.start()
 
     # Initial energy - should stay the same in isolated system
-    total_energy = sum(0.5 * (p.vx ** 2 + p.vy ** 2) for p in particles)
+    total_energy = current_energy = sim.initial_energy
 
     running = True
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_h and isinstance(renderer, HeatmapRenderer):
+                renderer.toggle()
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                steps_per_frame *= 2  # fast-forward
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                steps_per_frame = max(1, steps_per_frame // 2)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                show_hud = not show_hud
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+                show_histogram = not show_histogram
 
         screen.fill((255, 255, 255))  # Białe tło
-
-        # Upadting position and checking collisions
-        for p in particles:
-            p.update_position()
-            p.check_walls()
-
-        # === 2. Clear the grid ===
-        for col in grid:
-            for cell in col:
-                cell.clear()
-
-        # === 3. Fill the grid with indexes ===
-        for i, p in enumerate(particles):
-            gx = int(p.x // CELL_SIZE)
-            gy = int(p.y // CELL_SIZE)
-            # Optional: check the borders of the grid (just in case)
-            gx = max(0, min(gx, GRID_W - 1))
-            gy = max(0, min(gy, GRID_H - 1))
-            grid[gx][gy].append(i)
-
-        # === 4. Checking collisions only inside neighbouring cells ===
-        for gx in range(GRID_W):
-            for gy in range(GRID_H):
-                cell = grid[gx][gy]
-                # collisions inside the cell
-                for i in range(len(cell)):
-                    for j in range(i + 1, len(cell)):
-                        p1 = particles[cell[i]]
-                        p2 = particles[cell[j]]
-                        p1.collide_with(p2)
-
-                # Collisions with neighbouring cells (left, right, diagonal)
-                for dx, dy in [(1, 0), (1, -1), (0, -1), (-1, -1)]:
-                    nx, ny = gx + dx, gy + dy
-                    if 0 <= nx < GRID_W and 0 <= ny < GRID_H:
-                        neighbor = grid[nx][ny]
-                        for i in cell:
-                            for j in neighbor:
-                                if i < j:  # avoiding double-checking
-                                    p1 = particles[i]
-                                    p2 = particles[j]
-                                    p1.collide_with(p2)
-
-        # Getting particles
-        for p in particles:
-            speed = math.hypot(p.vx, p.vy)
-            # Color dependent on the speed (blue -> red)
-            color_val = min(255, int(40 * speed))
-            color = (color_val, 0, 255 - color_val)
-            pygame.draw.circle(screen, color, (int(p.x), int(p.y)), PARTICLE_RADIUS)
-
-        # === 6. Kinetic energy ===
-        current_energy = sum(0.5 * (p.vx ** 2 + p.vy ** 2) for p in particles)
+        speeds = None
+
+        if physics is None:
+            # === 1-4. Position update, walls, grid and collisions ===
+            sim.step(steps_per_frame)
+
+            # === 5. Drawing particles, color dependent on the speed (blue -> red) ===
+            profiler.resume()
+            speeds = sim.speeds()
+            renderer.draw(screen, sim.particles.x, sim.particles.y, speeds)
+            profiler.mark("draw")
+
+            # === 6. Kinetic energy ===
+            current_energy = sim.kinetic_energy()
+            profiler.mark("energy")
+        elif process:
+            physics.steps_per_frame = steps_per_frame
+            frame = physics.latest()  # views into shared memory, nothing copied
+            while frame is not None:
+                renderer.draw(screen, frame.x, frame.y, frame.speeds)
+                speeds = frame.speeds.copy() if show_histogram else None
+                if frame.intact():
+                    total_energy, current_energy = physics.initial_energy, frame.energy
+                    break
+                # the physics came around to this slot while it was drawn,
+                # draw the newest frame instead of a torn one
+                screen.fill((255, 255, 255))
+                frame = physics.latest()
+        else:
+            physics.steps_per_frame = steps_per_frame
+            with physics.latest() as snapshot:
+                renderer.draw(screen, snapshot.x, snapshot.y, snapshot.speeds)
+                speeds = snapshot.speeds.copy() if show_histogram else None
+                current_energy = snapshot.energy
         energy_text = font.render(f"Energia: {current_energy:.1f} (stała: {total_energy:.1f})", True, (0, 0, 0))
         screen.blit(energy_text, (10, 10))
+        if show_histogram and speeds is not None:
+            histogram.update(speeds)
+            draw_speed_histogram(screen, histogram, (WIDTH - 260, 10, 250, 120))
+        if show_hud and profiler is not None:
+            for row, line in enumerate(profiler.summary(), start=1):
+                screen.blit(font.render(line, True, (0, 0, 0)), (10, 10 + 22 * row))
 
         # Energy difference (should be ~0)
         diff = abs(current_energy - total_energy)
@@ -163,11 +124,81 @@ def simulate(num_particles, max_speed):
         pygame.display.flip()
         clock.tick(60)
 
+    if physics is not None:
+        physics.stop()
+    else:
+        sim.close()
+    if profile_file is not None:
+        profile_file.close()
+    pygame.quit()
+    sys.exit()
+
+
+def replay(path, heatmap_threshold=HEATMAP_THRESHOLD):
+    # Recorded trajectory instead of physics: space pauses, left / right step
+    # one frame, up / down change the speed, a click on the bar seeks
+    trajectory = Trajectory(path)
+    width, height = int(trajectory.width), int(trajectory.height)
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption(f"Odtwarzanie: {path}")
+    clock = pygame.time.Clock()
+    font = pygame.font.SysFont("Arial", 18)
+    renderer = make_renderer(trajectory.num_particles, heatmap_threshold, trajectory.radius,
+                             width, height).convert()
+    cursor = ReplayCursor(trajectory)
+    total_energy = cursor.energy()
+    bar = pygame.Rect(10, height - 20, width - 20, 10)
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    cursor.toggle_pause()
+                elif event.key == pygame.K_RIGHT:
+                    cursor.seek(cursor.index + 1)
+                elif event.key == pygame.K_LEFT:
+                    cursor.seek(cursor.index - 1)
+                elif event.key == pygame.K_UP:
+                    cursor.faster()
+                elif event.key == pygame.K_DOWN:
+                    cursor.slower()
+                elif event.key == pygame.K_HOME:
+                    cursor.seek(0)
+                elif event.key == pygame.K_END:
+                    cursor.seek(cursor.last())
+                elif event.key == pygame.K_h and isinstance(renderer, HeatmapRenderer):
+                    renderer.toggle()
+            elif event.type == pygame.MOUSEBUTTONDOWN and bar.collidepoint(event.pos):
+                cursor.seek_fraction((event.pos[0] - bar.x) / bar.width)
+
+        screen.fill((255, 255, 255))  # Białe tło
+        k = cursor.advance()
+        x, y, speeds = cursor.frame()
+        renderer.draw(screen, x, y, speeds)
+
+        current_energy = cursor.energy()
+        status = "pauza" if cursor.paused else f"x{cursor.speed:g}"
+        text = (f"Klatka {k + 1}/{len(trajectory)} (krok {trajectory.step_of(k)}), {status}, "
+                f"Energia: {current_energy:.1f} (początkowa: {total_energy:.1f})")
+        screen.blit(font.render(text, True, (0, 0, 0)), (10, 10))
+        pygame.draw.rect(screen, (200, 200, 200), bar)
+        done = bar.width * k // max(1, cursor.last())
+        pygame.draw.rect(screen, (80, 80, 80), (bar.x, bar.y, done, bar.height))
+
+        pygame.display.flip()
+        clock.tick(60)
+
     pygame.quit()
     sys.exit()
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        replay(sys.argv[1])  # python "symulator zderzeń.py" run.traj
     num_particles = 3000
     max_speed = 10
     simulate(num_particles, max_speed)
\ No newline at end of file
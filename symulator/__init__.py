@@ -0,0 +1,41 @@
+from .backends import NumbaBackend, NumpyBackend, get_backend
+from .broadphase import CellGrid, NeighbourList
+from .checkpoint import load_checkpoint, save_checkpoint
+from .engine import Simulation
+from .event_driven import EventDrivenSimulation
+from .observables import (
+    CollisionStats, MeanSquaredDisplacement, PressureMeter, RadialDistribution, SpeedHistogram,
+    UnfoldedDisplacement)
+from .parallel import ParallelSimulation
+from .particles import ParticleSystem, ParticleView
+from .profiling import StepProfiler
+from .ring import FrameRing, PhysicsProcess
+from .threaded import PhysicsThread
+from .trajectory import Trajectory, TrajectoryWriter
+
+__all__ = [
+    "CellGrid",
+    "CollisionStats",
+    "EventDrivenSimulation",
+    "FrameRing",
+    "MeanSquaredDisplacement",
+    "NeighbourList",
+    "NumbaBackend",
+    "NumpyBackend",
+    "ParallelSimulation",
+    "ParticleSystem",
+    "ParticleView",
+    "PhysicsProcess",
+    "PhysicsThread",
+    "PressureMeter",
+    "RadialDistribution",
+    "Simulation",
+    "SpeedHistogram",
+    "StepProfiler",
+    "Trajectory",
+    "TrajectoryWriter",
+    "UnfoldedDisplacement",
+    "get_backend",
+    "load_checkpoint",
+    "save_checkpoint",
+]
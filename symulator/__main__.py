@@ -0,0 +1,178 @@
+# Headless run: python -m symulator --particles 10000 --steps 1000
+import argparse
+import time
+
+import numpy as np
+
+from .checkpoint import load_checkpoint, save_checkpoint
+from .config import PARTICLE_RADIUS
+from .engine import Simulation
+from .event_driven import EventDrivenSimulation
+from .observables import MeanSquaredDisplacement, PressureMeter, RadialDistribution
+from .parallel import ParallelSimulation
+from .placement import PLACEMENTS
+from .profiling import StepProfiler
+from .trajectory import TrajectoryWriter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Symulacja zderzeń cząstek gazu 2D bez okna")
+    parser.add_argument("--particles", type=int, default=3000)
+    parser.add_argument("--max-speed", type=float, default=10)
+    parser.add_argument("--radius", type=float, default=PARTICLE_RADIUS)
+    parser.add_argument("--seed", type=int,
+                        help="seed of the random generator, the same seed repeats the run exactly")
+    parser.add_argument("--placement", default="random", choices=sorted(PLACEMENTS),
+                        help="initial positions: random (may overlap), non-overlapping poisson "
+                             "(Poisson-disc), square or hex lattice, or auto (poisson, hex "
+                             "when too dense)")
+    parser.add_argument("--periodic", action="store_true",
+                        help="periodic box instead of walls, for bulk gas properties")
+    parser.add_argument("--skin", type=float,
+                        help="use Verlet neighbour lists with this skin, "
+                             "it has to exceed 2 * max_speed * dt to save rebuilds")
+    parser.add_argument("--event-driven", action="store_true",
+                        help="exact collision times instead of fixed time steps")
+    parser.add_argument("--workers", type=int,
+                        help="split the box into strips simulated by this many processes")
+    parser.add_argument("--threads", type=int,
+                        help="resolve collisions of independent cell colours in this many threads")
+    parser.add_argument("--backend", default="numpy", help="kernels: numpy, numba or auto")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write per-step phase timings to PATH, JSON lines for .json/.jsonl, else CSV")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="save the state to PATH (.npz, {step} is replaced by the step)")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, metavar="N",
+                        help="steps between checkpoints")
+    parser.add_argument("--restore", metavar="PATH",
+                        help="continue from a checkpoint, the engine options are taken from it")
+    parser.add_argument("--trajectory", metavar="PATH",
+                        help="record x, y, vx, vy as float32 frames into PATH")
+    parser.add_argument("--trajectory-stride", type=int, default=1, metavar="K",
+                        help="steps between recorded frames")
+    parser.add_argument("--rdf", metavar="PATH", help="write the pair correlation g(r) to PATH")
+    parser.add_argument("--rdf-every", type=int, default=10, metavar="K",
+                        help="steps between g(r) samples")
+    parser.add_argument("--rdf-rmax", type=float, help="largest r of g(r), 10 radii by default")
+    parser.add_argument("--msd-every", type=int, metavar="K",
+                        help="track unfolded displacements and sample the MSD every K steps, "
+                             "the reports add the diffusion coefficient")
+    parser.add_argument("--msd-window", type=int, default=256, metavar="T",
+                        help="MSD samples kept as time origins")
+    parser.add_argument("--collision-stats", action="store_true",
+                        help="count collisions per particle and compare the collision rate "
+                             "and mean free path with kinetic theory")
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--report-every", type=int, default=100)
+    args = parser.parse_args(argv)
+    if args.event_driven and (args.skin is not None or args.workers or args.threads):
+        parser.error("--event-driven cannot be combined with --skin, --workers or --threads")
+    if min(args.checkpoint_every, args.trajectory_stride, args.rdf_every) < 1:
+        parser.error("--checkpoint-every, --trajectory-stride and --rdf-every must be at least 1")
+    if (args.profile or args.msd_every) and (args.event_driven or args.workers):
+        parser.error("--profile and --msd-every need the fixed-step engine, "
+                     "not --event-driven or --workers")
+    if args.periodic and (args.event_driven or args.workers):
+        parser.error("--periodic needs the fixed-step engine, not --event-driven or --workers")
+    if args.collision_stats and args.workers:
+        parser.error("--collision-stats does not work with --workers")
+    if args.backend != "numpy" and (args.event_driven or args.workers):
+        parser.error("--backend needs the fixed-step engine, not --event-driven or --workers")
+    if args.msd_every is not None and args.msd_every < 1:
+        parser.error("--msd-every must be at least 1")
+
+    profile_file = profiler = None
+    if args.profile:
+        profile_file = open(args.profile, "w", newline="")
+        fmt = "json" if args.profile.endswith((".json", ".jsonl")) else "csv"
+        profiler = StepProfiler(profile_file, fmt)
+
+    if args.restore:
+        sim = load_checkpoint(args.restore, **({"profiler": profiler} if profiler else {}))
+        args.event_driven = isinstance(sim, EventDrivenSimulation)
+    elif args.event_driven:
+        sim = EventDrivenSimulation(args.particles, args.max_speed, radius=args.radius,
+                                    track_collisions=args.collision_stats,
+                                    placement=args.placement, seed=args.seed)
+    elif args.workers:
+        sim = ParallelSimulation(args.particles, args.max_speed, workers=args.workers,
+                                 radius=args.radius, placement=args.placement,
+                                 seed=args.seed)
+    else:
+        sim = Simulation(args.particles, args.max_speed, radius=args.radius,
+                         neighbour_skin=args.skin, threads=args.threads, backend=args.backend,
+                         profiler=profiler, track_displacement=bool(args.msd_every),
+                         track_collisions=args.collision_stats, placement=args.placement,
+                         periodic=args.periodic, seed=args.seed)
+    # (every, action): things done whenever the step counter is a multiple of every
+    tasks = []
+    if args.checkpoint:
+        tasks.append((args.checkpoint_every, lambda: save_checkpoint(sim, args.checkpoint)))
+    writer = None
+    if args.trajectory:
+        # the current state plus every frame falling into the run
+        stride = args.trajectory_stride
+        frames = (sim.step_count + args.steps) // stride - sim.step_count // stride + 1
+        writer = TrajectoryWriter(args.trajectory, sim, frames, stride)
+        writer.record(sim)
+        tasks.append((stride, lambda: writer.record(sim)))
+    rdf = None
+    if args.rdf:
+        r_max = args.rdf_rmax if args.rdf_rmax else 10 * sim.radius
+        rdf = RadialDistribution(sim.width, sim.height, r_max, radius=sim.radius,
+                                 periodic=sim.periodic)
+        tasks.append((args.rdf_every, lambda: rdf.update(sim.particles.x, sim.particles.y)))
+    msd = None
+    if args.msd_every:
+        if sim.unfolded is None:
+            parser.error("the restored checkpoint does not track displacements")
+        msd = MeanSquaredDisplacement(args.msd_window).sample(sim)
+        tasks.append((args.msd_every, lambda: msd.sample(sim)))
+    # wall pressure over the last 10 reports, a periodic box has no walls
+    pressure = None if sim.periodic else PressureMeter(sim, window=10)
+    start = time.perf_counter()
+    done = 0
+    while done < args.steps:
+        chunk = min(args.report_every - done % args.report_every, args.steps - done)
+        chunk = min([chunk] + [every - sim.step_count % every for every, _ in tasks])
+        sim.step(chunk)
+        done += chunk
+        for every, action in tasks:
+            if sim.step_count % every == 0:
+                action()
+        if done % args.report_every and done < args.steps:
+            continue
+        obs = sim.observables()
+        if pressure is not None:
+            pressure.sample()
+        print(f"krok {obs['step']}: E = {obs['energy']:.3f} (ΔE = {obs['energy_drift']:.2e}), "
+              f"kT = {obs['temperature']:.3f}, zderzenia = {obs['collisions']}"
+              + (f", P = {pressure.pressure():.4f}, PV/NkT = {pressure.compressibility():.3f}"
+                 if pressure is not None else "")
+              + (f", D = {diffusion:.3f}" if msd and (diffusion := msd.diffusion()) else "")
+              + (collision_report(sim) if sim.collision_stats is not None else "")
+              + (f", zdarzenia = {obs['events']}" if "events" in obs else ""))
+    elapsed = time.perf_counter() - start
+    if writer is not None:
+        writer.close()
+    if rdf is not None:
+        np.savetxt(args.rdf, np.column_stack((rdf.centres(), rdf.g())), header="r g",
+                   comments="")
+    if not args.event_driven:
+        sim.close()
+    if profile_file is not None:
+        profile_file.close()
+    print(f"{done} kroków w {elapsed:.2f} s ({done / elapsed:.1f} kroków/s)")
+
+
+def collision_report(sim):
+    stats = sim.collision_stats
+    rate, path = stats.expected(sim)
+    if stats.mean_free_path() is None:
+        return f", z = 0 (teoria {rate:.4f})"
+    return (f", z = {stats.collision_rate():.4f} (teoria {rate:.4f}), "
+            f"λ = {stats.mean_free_path():.2f} (teoria {path:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import warnings
+
+import numpy as np
+
+from .particles import reflect_walls, resolve_pairs, wrap_positions
+
+try:
+    import numba
+except ImportError:  # the JIT backend is optional
+    numba = None
+
+
+class NumpyBackend:
+    """Reference kernels: vectorized NumPy, no compilation."""
+
+    name = "numpy"
+
+    def integrate(self, x, y, vx, vy, dt):
+        x += vx * dt
+        y += vy * dt
+
+    def reflect_walls(self, x, y, vx, vy, radius, width, height, impulse=None):
+        reflect_walls(x, y, vx, vy, radius, width, height, impulse)
+
+    def wrap(self, x, y, width, height):
+        wrap_positions(x, y, width, height)
+
+    def build(self, grid, x, y):
+        return grid.build(x, y)
+
+    def collide(self, x, y, vx, vy, i, j, radius, box=None):
+        return resolve_pairs(x, y, vx, vy, i, j, radius, box)
+
+
+class NumbaBackend(NumpyBackend):
+    """Same kernels as plain loops compiled by Numba.
+
+    The pair loop runs sequentially in candidate order, which is exactly what
+    resolve_pairs reproduces with its rounds, so both backends agree up to
+    rounding. Compilation happens on the first call. The kernels release
+    the GIL, so the colour chunks of the thread pool run side by side.
+    """
+
+    name = "numba"
+
+    def __init__(self):
+        if numba is None:
+            raise ImportError("the numba backend needs the numba package")
+        self._kernels = _compile()
+
+    def integrate(self, x, y, vx, vy, dt):
+        self._kernels["integrate"](x, y, vx, vy, dt)
+
+    def reflect_walls(self, x, y, vx, vy, radius, width, height, impulse=None):
+        out = np.zeros(4) if impulse is None else impulse
+        self._kernels["walls"](x, y, vx, vy, radius, width, height, out)
+
+    def wrap(self, x, y, width, height):
+        self._kernels["wrap"](x, y, width, height)
+
+    def build(self, grid, x, y):
+        grid.cell, grid.order, grid.start = self._kernels["build"](
+            x, y, grid.cell_w, grid.cell_h, grid.grid_w, grid.grid_h, grid.periodic)
+        return grid
+
+    def collide(self, x, y, vx, vy, i, j, radius, box=None):
+        if np.any(i == j):
+            raise ValueError("a particle cannot collide with itself")
+        # a box of 0 x 0 means walls, no minimum image
+        box_w, box_h = (0.0, 0.0) if box is None else box
+        hit = self._kernels["collide"](x, y, vx, vy, i, j, radius, box_w, box_h)
+        return i[hit], j[hit]
+
+
+BACKENDS = {"numpy": NumpyBackend, "numba": NumbaBackend}
+
+
+def get_backend(name="auto"):
+    """Backend by name, "auto" takes Numba when it is installed.
+
+    Asking for a backend that cannot be loaded falls back to NumPy with a
+    warning instead of failing the run.
+    """
+    if not isinstance(name, str):
+        return name  # already a backend object
+    if name == "auto":
+        name = "numba" if numba is not None else "numpy"
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend {name!r}, choose from {sorted(BACKENDS)}")
+    try:
+        return BACKENDS[name]()
+    except ImportError as exc:
+        warnings.warn(f"{exc}, falling back to numpy", RuntimeWarning, stacklevel=2)
+        return NumpyBackend()
+
+
+def available_backends():
+    return ["numpy"] + (["numba"] if numba is not None else [])
+
+
+_compiled = None
+
+
+def _compile():
+    global _compiled
+    if _compiled is not None:
+        return _compiled
+
+    @numba.njit(cache=True, nogil=True)
+    def integrate(x, y, vx, vy, dt):
+        for k in range(len(x)):
+            x[k] += vx[k] * dt
+            y[k] += vy[k] * dt
+
+    @numba.njit(cache=True, nogil=True)
+    def walls(x, y, vx, vy, radius, width, height, impulse):
+        for k in range(len(x)):
+            low, high = x[k] - radius < 0, x[k] + radius > width
+            if low or high:
+                impulse[0 if low else 1] += 2 * abs(vx[k])
+                vx[k] = -vx[k]
+                x[k] = max(radius, min(x[k], width - radius))
+            low, high = y[k] - radius < 0, y[k] + radius > height
+            if low or high:
+                impulse[2 if low else 3] += 2 * abs(vy[k])
+                vy[k] = -vy[k]
+                y[k] = max(radius, min(y[k], height - radius))
+
+    @numba.njit(cache=True, nogil=True)
+    def wrap(x, y, width, height):
+        for k in range(len(x)):
+            x[k] = x[k] % width
+            y[k] = y[k] % height
+
+    @numba.njit(cache=True, nogil=True)
+    def build(x, y, cell_w, cell_h, grid_w, grid_h, periodic):
+        # counting sort: histogram, prefix sum, scatter in index order
+        n = len(x)
+        cell = np.empty(n, dtype=np.intp)
+        start = np.zeros(grid_w * grid_h + 1, dtype=np.intp)
+        for k in range(n):
+            gx = int(x[k] // cell_w)
+            gy = int(y[k] // cell_h)
+            if periodic:
+                gx %= grid_w
+                gy %= grid_h
+            else:
+                gx = min(max(gx, 0), grid_w - 1)
+                gy = min(max(gy, 0), grid_h - 1)
+            cell[k] = gx * grid_h + gy
+            start[cell[k] + 1] += 1
+        for c in range(grid_w * grid_h):
+            start[c + 1] += start[c]
+        fill = start[:-1].copy()
+        order = np.empty(n, dtype=np.intp)
+        for k in range(n):
+            order[fill[cell[k]]] = k
+            fill[cell[k]] += 1
+        return cell, order, start
+
+    @numba.njit(cache=True, nogil=True)
+    def image(d, length):
+        # particles.minimum_image, length 0 leaves d alone
+        if length > 0:
+            d -= length * np.floor(d / length + 0.5)
+        return d
+
+    @numba.njit(cache=True, nogil=True)
+    def collide(x, y, vx, vy, i, j, radius, box_w, box_h):
+        m = len(i)
+        diameter2 = 4 * radius * radius
+        hit = np.zeros(m, dtype=np.bool_)
+        # same entry filter as resolve_pairs
+        close = np.empty(m, dtype=np.bool_)
+        for k in range(m):
+            dx = image(x[j[k]] - x[i[k]], box_w)
+            dy = image(y[j[k]] - y[i[k]], box_h)
+            close[k] = dx * dx + dy * dy < diameter2
+        for k in range(m):
+            if not close[k]:
+                continue
+            a, b = i[k], j[k]
+            dx = image(x[b] - x[a], box_w)
+            dy = image(y[b] - y[a], box_h)
+            dist = np.sqrt(dx * dx + dy * dy)
+            if not dist < 2 * radius or dist == 0:
+                continue
+            nx = dx / dist
+            ny = dy / dist
+            dvn = (vx[a] - vx[b]) * nx + (vy[a] - vy[b]) * ny
+            if dvn <= 0:
+                continue
+            vx[a] -= dvn * nx
+            vy[a] -= dvn * ny
+            vx[b] += dvn * nx
+            vy[b] += dvn * ny
+            sep = (2 * radius - dist) / 2.0
+            x[a] -= sep * nx
+            y[a] -= sep * ny
+            x[b] += sep * nx
+            y[b] += sep * ny
+            hit[k] = True
+        return hit
+
+    _compiled = {"integrate": integrate, "walls": walls, "wrap": wrap, "build": build,
+                 "collide": collide}
+    return _compiled
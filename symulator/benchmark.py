@@ -0,0 +1,177 @@
+# Benchmark of the headless engine: python -m symulator.benchmark --output bench.json
+import argparse
+import itertools
+import json
+import math
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+from .config import WIDTH, HEIGHT
+from .backends import available_backends
+from .engine import Simulation
+from .parallel import ParallelSimulation
+
+DEFAULT_PARTICLES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_SPEEDS = (2, 10)
+DEFAULT_RADII = (2, 5)
+REFERENCE_PARTICLES = 3000  # the box of the viewer holds this many by default
+
+
+def box_for(num_particles, scale_box=True):
+    # keep the number density of the default 800x600 box with 3000 particles
+    if not scale_box:
+        return WIDTH, HEIGHT
+    factor = math.sqrt(num_particles / REFERENCE_PARTICLES)
+    return WIDTH * factor, HEIGHT * factor
+
+
+def run_case(num_particles, max_speed, radius, steps, scale_box=True, seed=0, skin=None,
+             workers=None, threads=None, backend="numpy"):
+    width, height = box_for(num_particles, scale_box)
+    options = dict(width=width, height=height, radius=radius, backend=backend,
+                   rng=np.random.default_rng(seed))
+    # JIT compilation is not part of the memory of a run, a tiny simulation
+    # compiles (or loads) the kernels before tracemalloc starts
+    Simulation(16, max_speed, backend=backend, rng=np.random.default_rng(seed)).step()
+    # peak memory covers building the arrays and the warm-up step, the timed
+    # steps run without tracemalloc because it slows everything down
+    tracemalloc.start()
+    if workers:
+        sim = ParallelSimulation(num_particles, max_speed, workers=workers, **options)
+    else:
+        sim = Simulation(num_particles, max_speed, neighbour_skin=skin, threads=threads,
+                         **options)
+    # warm-up, the first step resolves the initial overlaps
+    sim.step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    pairs = collisions = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        sim.step()
+        pairs += sim.pairs_tested
+        collisions += sim.collisions
+    elapsed = time.perf_counter() - start
+
+    sim.close()
+
+    return {
+        "num_particles": num_particles,
+        "max_speed": max_speed,
+        "radius": radius,
+        "width": width,
+        "height": height,
+        "packing_fraction": num_particles * math.pi * radius ** 2 / (width * height),
+        "skin": skin,
+        "workers": sim.workers if workers else None,
+        "threads": threads,
+        "backend": sim.backend.name,
+        "steps": steps,
+        "seconds": elapsed,
+        "steps_per_sec": steps / elapsed,
+        "pairs_per_sec": pairs / elapsed,
+        "collisions_per_step": collisions / steps,
+        "neighbour_rebuilds": sim.neighbours.rebuilds if sim.neighbours else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_matrix(particles=DEFAULT_PARTICLES, speeds=DEFAULT_SPEEDS, radii=DEFAULT_RADII,
+               steps=10, scale_box=True, seed=0, skin=None, workers=None, threads=None,
+               backends=("numpy",), progress=None):
+    results = []
+    for n, speed, radius, backend in itertools.product(particles, speeds, radii, backends):
+        result = run_case(n, speed, radius, steps, scale_box=scale_box, seed=seed, skin=skin,
+                          workers=workers, threads=threads, backend=backend)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def case_key(result):
+    # runs are only comparable with the same engine and box
+    return (result["num_particles"], result["max_speed"], result["radius"],
+            result["width"], result["height"], result.get("skin"), result.get("workers"),
+            result.get("threads"), result.get("backend", "numpy"))
+
+
+def speedups(report, reference="numpy"):
+    # steps/sec of every backend relative to the reference backend of the same case
+    base = {case_key(r)[:-1]: r for r in report["results"] if r["backend"] == reference}
+    ratios = {}
+    for result in report["results"]:
+        key = case_key(result)
+        if result["backend"] != reference and key[:-1] in base:
+            ratios[key] = result["steps_per_sec"] / base[key[:-1]]["steps_per_sec"]
+    return ratios
+
+
+def compare(old, new):
+    # steps/sec ratio new/old for every case present in both runs
+    old_cases = {case_key(r): r for r in old["results"]}
+    ratios = {}
+    for result in new["results"]:
+        key = case_key(result)
+        if key in old_cases:
+            ratios[key] = result["steps_per_sec"] / old_cases[key]["steps_per_sec"]
+    return ratios
+
+
+def format_result(result):
+    return (f"N={result['num_particles']:>8} v={result['max_speed']:<4} r={result['radius']:<4} "
+            f"{result['backend']:<6}"
+            f"{result['steps_per_sec']:9.2f} kroków/s {result['pairs_per_sec']:12.0f} par/s "
+            f"{result['peak_memory_bytes'] / 2 ** 20:8.1f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark symulatora zderzeń")
+    parser.add_argument("--particles", type=int, nargs="+", default=DEFAULT_PARTICLES)
+    parser.add_argument("--max-speed", type=float, nargs="+", default=DEFAULT_SPEEDS)
+    parser.add_argument("--radius", type=float, nargs="+", default=DEFAULT_RADII)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixed-box", action="store_true",
+                        help="keep the 800x600 box instead of scaling it with the particle count")
+    parser.add_argument("--skin", type=float,
+                        help="use Verlet neighbour lists with this skin, "
+                             "it has to exceed 2 * max_speed * dt to save rebuilds")
+    parser.add_argument("--workers", type=int, help="run the parallel engine with this many processes")
+    parser.add_argument("--threads", type=int, help="thread pool size for the collision pass")
+    parser.add_argument("--backend", nargs="+", default=["numpy"],
+                        help=f"kernel backends to compare, available: {', '.join(available_backends())}")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="JSON of an earlier run to compare against")
+    args = parser.parse_args(argv)
+    if args.workers and set(args.backend) != {"numpy"}:
+        parser.error("--workers runs the numpy kernels only, it cannot compare backends")
+
+    report = run_matrix(args.particles, args.max_speed, args.radius, args.steps,
+                        scale_box=not args.fixed_box, seed=args.seed, skin=args.skin,
+                        workers=args.workers, threads=args.threads, backends=args.backend,
+                        progress=lambda result: print(format_result(result), flush=True))
+    for (n, speed, radius, *_, backend), ratio in speedups(report).items():
+        print(f"N={n:>8} v={speed:<4} r={radius:<4} {backend:<6} {ratio:6.2f}x względem numpy")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        for (n, speed, radius, *_), ratio in compare(old, report).items():
+            print(f"N={n:>8} v={speed:<4} r={radius:<4} {ratio:6.2f}x względem {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
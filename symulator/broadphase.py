@@ -0,0 +1,180 @@
+import math
+
+import numpy as np
+
+from .config import WIDTH, HEIGHT, CELL_SIZE
+from .particles import minimum_image
+
+# Neighbouring cells checked from every cell (left, right, diagonal), together
+# with the cell itself this visits every pair of adjacent cells exactly once
+HALF_NEIGHBOURS = ((1, 0), (1, -1), (0, -1), (-1, -1))
+# The stencil of cell (gx, gy) spans columns gx-1..gx+1 and rows gy-1..gy, so
+# cells of one colour (gx % 3, gy % 2) never reach a common cell
+NUM_COLOURS = 6
+
+
+class CellGrid:
+    """Cell list stored as flat arrays instead of a list of lists.
+
+    build() assigns a cell id to every particle, counts particles per cell and
+    sorts the indices by cell, so cell c holds order[start[c]:start[c + 1]].
+    Cell ids follow the old grid[gx][gy] layout: id = gx * grid_h + gy.
+
+    A periodic grid is a torus: the cells tile the box exactly, so they are
+    stretched to at least cell_size, and neighbours wrap around the edges.
+    Its column count is a multiple of 3 and its row count even, which keeps
+    the six stencil colours independent across the seam as well.
+    """
+
+    def __init__(self, width=WIDTH, height=HEIGHT, cell_size=CELL_SIZE, periodic=False):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.periodic = periodic
+        if periodic:
+            self.grid_w = int(width // cell_size) // 3 * 3
+            self.grid_h = int(height // cell_size) // 2 * 2
+            if self.grid_w < 3 or self.grid_h < 4:
+                raise ValueError("a periodic grid needs room for at least 3 x 4 cells")
+        else:
+            self.grid_w = max(1, math.ceil(width / cell_size))
+            self.grid_h = max(1, math.ceil(height / cell_size))
+        # cells are cell_size wide unless stretched to tile a periodic box
+        self.cell_w = width / self.grid_w if periodic else cell_size
+        self.cell_h = height / self.grid_h if periodic else cell_size
+        self.num_cells = self.grid_w * self.grid_h
+        self.cell = None  # cell id of every particle
+        self.order = None  # particle indices sorted by cell
+        self.start = None  # offsets into order, one more than the number of cells
+
+    def cell_ids(self, x, y):
+        gx = (x // self.cell_w).astype(np.intp)
+        gy = (y // self.cell_h).astype(np.intp)
+        if self.periodic:
+            # positions pushed just past the seam belong to the far side
+            np.remainder(gx, self.grid_w, out=gx)
+            np.remainder(gy, self.grid_h, out=gy)
+        else:
+            # check the borders of the grid (just in case)
+            np.clip(gx, 0, self.grid_w - 1, out=gx)
+            np.clip(gy, 0, self.grid_h - 1, out=gy)
+        return gx * self.grid_h + gy
+
+    def build(self, x, y):
+        return self.assign(self.cell_ids(x, y))
+
+    def assign(self, cell):
+        # counting sort of precomputed cell ids
+        self.cell = cell
+        counts = np.bincount(self.cell, minlength=self.num_cells)
+        self.start = np.zeros(self.num_cells + 1, dtype=np.intp)
+        np.cumsum(counts, out=self.start[1:])
+        # stable sort keeps particles of one cell in index order
+        self.order = np.argsort(self.cell, kind="stable")
+        return self
+
+    def colours(self, cell):
+        # colour of the stencil rooted at each cell id
+        return (cell // self.grid_h) % 3 * 2 + (cell % self.grid_h) % 2
+
+    def counts(self):
+        return np.diff(self.start)
+
+    def pairs(self):
+        """Candidate pairs (i, j) from each cell and its half neighbourhood.
+
+        Every pair of particles in the same or adjacent cells appears exactly
+        once, ordered by the cell of i.
+        """
+        n = len(self.order)
+        if n < 2:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        sorted_cell = self.cell[self.order]
+        gx = sorted_cell // self.grid_h
+        gy = sorted_cell % self.grid_h
+        pos = np.arange(n, dtype=np.intp)
+
+        # for every sorted particle a range of partner positions per stencil
+        # entry: the rest of its own cell, then each half neighbour
+        lo = np.empty((n, 1 + len(HALF_NEIGHBOURS)), dtype=np.intp)
+        hi = np.empty_like(lo)
+        lo[:, 0] = pos + 1
+        hi[:, 0] = self.start[sorted_cell + 1]
+        for k, (dx, dy) in enumerate(HALF_NEIGHBOURS, start=1):
+            nx, ny = gx + dx, gy + dy
+            if self.periodic:
+                nx %= self.grid_w
+                ny %= self.grid_h
+            valid = (nx >= 0) & (nx < self.grid_w) & (ny >= 0) & (ny < self.grid_h)
+            neighbour = np.where(valid, nx * self.grid_h + ny, 0)
+            lo[:, k] = self.start[neighbour]
+            hi[:, k] = np.where(valid, self.start[neighbour + 1], lo[:, k])
+        return self._expand(lo, hi)
+
+    def _expand(self, lo, hi):
+        # turn the ranges into explicit (i, j) index arrays
+        lo = lo.ravel()
+        counts = hi.ravel() - lo
+        total = int(counts.sum())
+        width = hi.shape[1]
+        owner = np.repeat(np.arange(len(lo), dtype=np.intp) // width, counts)
+        offsets = np.cumsum(counts) - counts
+        partner = np.arange(total, dtype=np.intp) + np.repeat(lo - offsets, counts)
+        return self.order[owner], self.order[partner]
+
+
+class NeighbourList:
+    """Verlet list of pairs closer than 2 * radius + skin.
+
+    The list is built from the cell grid and reused until some particle has
+    moved more than skin / 2 since the build, before that no pair outside the
+    list can have come into contact. The skin has to exceed twice the distance
+    covered per step to skip rebuilds, with DT = 1 and max_speed = 10 that is
+    a skin above about 20. In a periodic box distances and moves are taken
+    with the minimum image, so wrapping around the seam is not a move.
+    """
+
+    def __init__(self, width, height, radius, skin, cell_size=None, periodic=False):
+        if skin < 0:
+            raise ValueError("skin must not be negative")
+        self.radius = radius
+        self.skin = skin
+        self.cutoff = 2 * radius + skin
+        # a pair within the cutoff has to sit in the same or adjacent cells
+        cell_size = self.cutoff if cell_size is None else max(cell_size, self.cutoff)
+        self.grid = CellGrid(width, height, cell_size, periodic)
+        self.box = (width, height) if periodic else None
+        self.i = None
+        self.j = None
+        self.ref_x = None
+        self.ref_y = None
+        self.rebuilds = 0
+
+    def needs_rebuild(self, x, y):
+        if self.i is None or len(x) != len(self.ref_x):
+            return True
+        dx = x - self.ref_x
+        dy = y - self.ref_y
+        if self.box is not None:
+            dx, dy = minimum_image(dx, self.box[0]), minimum_image(dy, self.box[1])
+        limit = self.skin / 2
+        return bool(np.max(dx * dx + dy * dy, initial=0.0) > limit * limit)
+
+    def build(self, x, y):
+        self.grid.build(x, y)
+        i, j = self.grid.pairs()
+        dx = x[j] - x[i]
+        dy = y[j] - y[i]
+        if self.box is not None:
+            dx, dy = minimum_image(dx, self.box[0]), minimum_image(dy, self.box[1])
+        keep = dx * dx + dy * dy < self.cutoff * self.cutoff
+        self.i, self.j = i[keep], j[keep]
+        self.ref_x = x.copy()
+        self.ref_y = y.copy()
+        self.rebuilds += 1
+
+    def pairs(self, x, y):
+        if self.needs_rebuild(x, y):
+            self.build(x, y)
+        return self.i, self.j
@@ -0,0 +1,93 @@
+import json
+import os
+
+import numpy as np
+
+from .engine import Simulation
+from .event_driven import EventDrivenSimulation
+from .parallel import ParallelSimulation
+
+ENGINES = {cls.__name__: cls for cls in (Simulation, EventDrivenSimulation, ParallelSimulation)}
+VERSION = 1
+
+
+def save_checkpoint(sim, path):
+    """Write the full state of sim to an uncompressed .npz file.
+
+    Positions, velocities, the step counter and time, the reference energy,
+    the momentum given to the walls, the constructor parameters and the
+    state of sim.rng, plus the Verlet list, the unfolded displacements and
+    the collision statistics when there are any, so a restored run continues
+    exactly where it stopped.
+    "{step}" in path is replaced by the step counter. The file is written
+    next to its final name and renamed, so an interrupted save never leaves
+    a broken checkpoint behind. Returns the path written.
+    """
+    path = str(path).format(step=sim.step_count)
+    meta = {
+        "version": VERSION,
+        "engine": type(sim).__name__,
+        "params": sim.parameters(),
+        "rng_state": sim.rng.bit_generator.state,
+        "step_count": sim.step_count,
+        "time": sim.time,
+        "initial_energy": sim.initial_energy,
+        "wall_impulse": sim.wall_impulse.tolist(),
+    }
+    p = sim.particles
+    arrays = {"x": p.x, "y": p.y, "vx": p.vx, "vy": p.vy}
+    if sim.neighbours is not None and sim.neighbours.i is not None:
+        nl = sim.neighbours
+        arrays.update(nl_i=nl.i, nl_j=nl.j, nl_ref_x=nl.ref_x, nl_ref_y=nl.ref_y,
+                      nl_rebuilds=np.array(nl.rebuilds))
+    if sim.unfolded is not None:
+        u = sim.unfolded
+        arrays.update(unfolded_dx=u.dx, unfolded_dy=u.dy, unfolded_sx=u.sx, unfolded_sy=u.sy)
+    if sim.collision_stats is not None:
+        c = sim.collision_stats
+        arrays.update(collision_counts=c.counts, collision_distance=c.distance,
+                      collision_time=np.array(c.time))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+def load_checkpoint(path, **overrides):
+    """Rebuild the simulation saved by save_checkpoint.
+
+    Keyword arguments replace saved constructor parameters, e.g. another
+    backend or thread count for a branch of the run.
+    """
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta["version"] != VERSION:
+            raise ValueError(f"unsupported checkpoint version {meta['version']}")
+        params = dict(meta["params"], **overrides)
+        placement = params.pop("placement", "random")
+        cls = ENGINES[meta["engine"]]
+        # built with the cheap default placement, the saved positions replace it
+        sim = cls(params.pop("num_particles"), params.pop("max_speed"), **params)
+        sim.placement = placement
+        # constructing drew random particles, the saved generator replaces them
+        sim.rng.bit_generator.state = meta["rng_state"]
+        sim.step_count = meta["step_count"]
+        sim.time = meta["time"]
+        sim.initial_energy = meta["initial_energy"]
+        sim.wall_impulse[:] = meta["wall_impulse"]
+        sim.set_state(data["x"], data["y"], data["vx"], data["vy"])
+        if sim.neighbours is not None and "nl_i" in data:
+            nl = sim.neighbours
+            nl.i, nl.j = data["nl_i"], data["nl_j"]
+            nl.ref_x, nl.ref_y = data["nl_ref_x"], data["nl_ref_y"]
+            nl.rebuilds = int(data["nl_rebuilds"])
+        if sim.unfolded is not None and "unfolded_dx" in data:
+            u = sim.unfolded
+            u.dx[:], u.dy[:] = data["unfolded_dx"], data["unfolded_dy"]
+            u.sx[:], u.sy[:] = data["unfolded_sx"], data["unfolded_sy"]
+        if sim.collision_stats is not None and "collision_counts" in data:
+            c = sim.collision_stats
+            c.counts[:], c.distance[:] = data["collision_counts"], data["collision_distance"]
+            c.time = float(data["collision_time"])
+    return sim
@@ -0,0 +1,8 @@
+# Stałe
+WIDTH, HEIGHT = 800, 600  # size of the window
+PARTICLE_RADIUS = 5  # Particle radius [px]
+DT = 1.0  # time delta [s]
+CELL_SIZE = 4 * PARTICLE_RADIUS  # cell size = 2* particle diameter for optimal results
+GRID_W = (WIDTH  + CELL_SIZE - 1) // CELL_SIZE
+GRID_H = (HEIGHT + CELL_SIZE - 1) // CELL_SIZE
+HEATMAP_THRESHOLD = 100_000  # above this many particles the viewer draws a heatmap
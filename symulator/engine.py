@@ -0,0 +1,233 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .backends import get_backend
+from .broadphase import CellGrid, NeighbourList
+from .config import WIDTH, HEIGHT, PARTICLE_RADIUS, DT
+from .observables import CollisionStats, UnfoldedDisplacement
+from .particles import ParticleSystem, resolve_pairs_coloured
+
+
+class Simulation:
+    """Headless collision engine, advanced with step(n).
+
+    Nothing here imports pygame, the viewer in "symulator zderzeń.py" only
+    reads the particle arrays after each step.
+    """
+
+    def __init__(self, num_particles, max_speed, width=WIDTH, height=HEIGHT,
+                 radius=PARTICLE_RADIUS, dt=DT, cell_size=None, dtype=np.float64,
+                 neighbour_skin=None, threads=None, backend="numpy", rng=None,
+                 profiler=None, track_displacement=False, track_collisions=False,
+                 placement="random", periodic=False, seed=None):
+        self.max_speed = max_speed
+        self.dt = dt
+        # kernels for integration, grid and collisions: "numpy", "numba" or "auto"
+        self.backend = get_backend(backend)
+        # every random draw of the run comes from this generator: a seed
+        # makes the run repeat bit for bit with the same backend and options
+        if rng is not None and seed is not None:
+            raise ValueError("pass either seed or rng, not both")
+        self.seed = seed
+        self.rng = np.random.default_rng(seed) if rng is None else rng
+        # initial positions: "random" (may overlap), "poisson", "square",
+        # "hex" or "auto", see placement.PLACEMENTS
+        self.placement = placement
+        self.particles = ParticleSystem.random(num_particles, max_speed, rng=self.rng,
+                                               placement=placement, width=width,
+                                               height=height, radius=radius, dtype=dtype)
+        # cell size = 2 * particle diameter for optimal results
+        self.cell_size = 4 * radius if cell_size is None else cell_size
+        # periodic: no walls, positions wrap and collisions see the nearest
+        # image, so the box stands for a piece of an unbounded gas
+        self.periodic = periodic
+        self.box = (width, height) if periodic else None
+        self.grid = CellGrid(width, height, self.cell_size, periodic)
+        # optional Verlet list, rebuilt only after moves larger than skin / 2
+        self.neighbours = None
+        if neighbour_skin is not None:
+            self.neighbours = NeighbourList(width, height, radius, neighbour_skin,
+                                            periodic=periodic)
+        # optional thread pool for the collision pass over cell colours
+        self.threads = threads
+        self.pool = None
+        if threads is not None and threads > 1:
+            if self.neighbours is not None:
+                raise ValueError("threads need the cell grid, not neighbour lists")
+            self.pool = ThreadPoolExecutor(max_workers=threads)
+        # optional StepProfiler timing every phase of every step
+        self.profiler = profiler
+        # optional displacements that ignore the walls, for diffusion
+        self.unfolded = UnfoldedDisplacement(num_particles) if track_displacement else None
+        # optional collision counters and free paths per particle
+        self.collision_stats = CollisionStats(num_particles) if track_collisions else None
+        self.step_count = 0
+        self.time = 0.0
+        # momentum given to each wall since the start (particles.WALLS order)
+        self.wall_impulse = np.zeros(4)
+        self.pairs_tested = 0  # candidate pairs in the last step
+        self.collisions = 0  # collisions resolved in the last step
+        # Initial energy - should stay the same in isolated system
+        self.initial_energy = self.particles.kinetic_energy()
+
+    def __len__(self):
+        return len(self.particles)
+
+    @property
+    def width(self):
+        return self.particles.width
+
+    @property
+    def height(self):
+        return self.particles.height
+
+    @property
+    def radius(self):
+        return self.particles.radius
+
+    @property
+    def positions(self):
+        return np.column_stack((self.particles.x, self.particles.y))
+
+    @property
+    def velocities(self):
+        return np.column_stack((self.particles.vx, self.particles.vy))
+
+    def step(self, n=1):
+        particles, backend, prof = self.particles, self.backend, self.profiler
+        unfolded = self.unfolded
+        x, y, vx, vy = particles.x, particles.y, particles.vx, particles.vy
+        for _ in range(n):
+            if prof is not None:
+                prof.begin()
+            # 1. position update and walls
+            backend.integrate(x, y, vx, vy, self.dt)
+            if prof is not None:
+                prof.mark("integrate")
+            if unfolded is not None:
+                unfolded.flight(x, y, vx, vy, self.dt, self.radius, self.width, self.height,
+                                self.periodic)
+            if not self.periodic:
+                backend.reflect_walls(x, y, vx, vy, self.radius, self.width, self.height,
+                                      self.wall_impulse)
+            if prof is not None:
+                prof.mark("walls")
+            # 2-4. candidate pairs from the grid or the neighbour list
+            pairs_i, pairs_j = self.candidate_pairs()
+            if prof is not None:
+                prof.mark("grid")
+            if unfolded is not None:
+                unfolded.mark(x, y)
+            # 5. collisions only inside neighbouring cells
+            if self.pool is not None:
+                home = self.grid.cell[pairs_i]
+                hit_i, hit_j = resolve_pairs_coloured(
+                    x, y, vx, vy, pairs_i, pairs_j, home, self.grid.colours(home),
+                    self.radius, self.pool, self.threads, resolve=backend.collide, box=self.box)
+            else:
+                hit_i, hit_j = backend.collide(x, y, vx, vy, pairs_i, pairs_j, self.radius,
+                                               self.box)
+            if unfolded is not None:
+                unfolded.collided(x, y, hit_i, hit_j)
+            if self.collision_stats is not None:
+                self.collision_stats.update(hit_i, hit_j, particles.speeds(), self.dt)
+            if prof is not None:
+                prof.mark("collisions")
+            if self.periodic:
+                # the grid and the collisions take positions past the seam,
+                # wrapping once at the end also catches separation pushes
+                backend.wrap(x, y, self.width, self.height)
+                if prof is not None:
+                    prof.mark("walls")
+
+            self.pairs_tested = len(pairs_i)
+            self.collisions = len(hit_i)
+            self.step_count += 1
+            self.time += self.dt
+            if prof is not None:
+                prof.end_step(self)
+        return self
+
+    def set_state(self, x, y, vx, vy):
+        # replace positions and velocities, e.g. from a checkpoint
+        p = self.particles
+        p.x[:] = x
+        p.y[:] = y
+        p.vx[:] = vx
+        p.vy[:] = vy
+        if self.neighbours is not None:
+            self.neighbours.i = None  # rebuilt before the next step
+
+    def parameters(self):
+        # constructor arguments that rebuild this simulation
+        return {
+            "num_particles": len(self),
+            "max_speed": self.max_speed,
+            "width": self.width,
+            "height": self.height,
+            "radius": self.radius,
+            "dt": self.dt,
+            "cell_size": self.cell_size,
+            "dtype": self.particles.dtype.str,
+            "neighbour_skin": self.neighbours.skin if self.neighbours is not None else None,
+            "threads": self.threads,
+            "backend": self.backend.name,
+            "track_displacement": self.unfolded is not None,
+            "track_collisions": self.collision_stats is not None,
+            "placement": self.placement,
+            "periodic": self.periodic,
+            "seed": self.seed,
+        }
+
+    def candidate_pairs(self):
+        x, y = self.particles.x, self.particles.y
+        if self.neighbours is not None:
+            return self.neighbours.pairs(x, y)
+        return self.backend.build(self.grid, x, y).pairs()
+
+    def close(self):
+        if self.profiler is not None:
+            self.profiler.flush()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def speeds(self):
+        return self.particles.speeds()
+
+    def kinetic_energy(self):
+        return self.particles.kinetic_energy()
+
+    def energy_drift(self):
+        return self.kinetic_energy() - self.initial_energy
+
+    def temperature(self):
+        # 2D gas with m = k = 1: E = N kT
+        return self.kinetic_energy() / max(1, len(self))
+
+    def momentum(self):
+        return (float(self.particles.vx.sum(dtype=np.float64)),
+                float(self.particles.vy.sum(dtype=np.float64)))
+
+    def observables(self):
+        px, py = self.momentum()
+        return {
+            "step": self.step_count,
+            "backend": self.backend.name,
+            "time": self.time,
+            "energy": self.kinetic_energy(),
+            "energy_drift": self.energy_drift(),
+            "temperature": self.temperature(),
+            "momentum_x": px,
+            "momentum_y": py,
+            "pairs_tested": self.pairs_tested,
+            "collisions": self.collisions,
+            "neighbour_rebuilds": self.neighbours.rebuilds if self.neighbours else None,
+        }
@@ -0,0 +1,267 @@
+import heapq
+import math
+
+import numpy as np
+
+from .engine import Simulation
+
+# event kinds
+PAIR, WALL_X, WALL_Y, CELL = range(4)
+# directions of a cell crossing
+RIGHT, LEFT, UP, DOWN = range(4)
+
+
+class EventDrivenSimulation(Simulation):
+    """Event-driven hard disks: jump from one collision to the next.
+
+    Collision times with other particles, the walls and the cell borders are
+    predicted exactly and kept in a priority queue. Every particle carries a
+    collision counter, an event stored with an older counter value is skipped
+    when it comes out of the queue. Pairs are only predicted against the 3x3
+    block of cells around a particle, so leaving a cell is an event as well.
+    Events at the same time come out by kind and particle index, never by
+    the order they happened to be predicted in, so a run depends only on
+    its initial state.
+
+    step(n) advances the time by n * dt and writes the positions into the
+    particle arrays, all other methods are the ones of Simulation.
+    """
+
+    def __init__(self, num_particles, max_speed, **kwargs):
+        super().__init__(num_particles, max_speed, **kwargs)
+        if self.pool is not None or self.backend.name != "numpy" or self.profiler is not None:
+            self.close()  # the thread pool is already running
+            raise ValueError("the event-driven engine uses no threads, kernel backends "
+                             "or step profiler")
+        if self.grid.cell_size < 2 * self.radius:
+            raise ValueError("cell_size must be at least the particle diameter")
+        if self.neighbours is not None:
+            raise ValueError("the event-driven engine does not use neighbour lists")
+        if self.periodic:
+            raise ValueError("the event-driven engine has no periodic box")
+        if self.unfolded is not None:
+            raise ValueError("the event-driven engine does not track displacements")
+        self.events = 0  # events processed in the last step
+        self._hits = []  # pairs that collided in this step, for collision_stats
+        self.reset_events()
+
+    def reset_events(self):
+        # (re)load the state from the particle arrays and predict all events
+        p = self.particles
+        self.clock = self.time
+        self._x = p.x.tolist()
+        self._y = p.y.tolist()
+        self._vx = p.vx.tolist()
+        self._vy = p.vy.tolist()
+        self._t = [self.clock] * len(p)
+        self._count = [0] * len(p)
+
+        grid = self.grid.build(p.x, p.y)
+        self._gx = (grid.cell // grid.grid_h).tolist()
+        self._gy = (grid.cell % grid.grid_h).tolist()
+        self._cells = [set() for _ in range(grid.num_cells)]
+        for c in range(grid.num_cells):
+            self._cells[c].update(grid.order[grid.start[c]:grid.start[c + 1]].tolist())
+
+        self._queue = []
+        for i in range(len(p)):
+            self._predict_walls(i)
+            self._predict_cell(i)
+            self._predict_pairs(i, self._neighbour_cells(i), later_only=True)
+
+    def step(self, n=1):
+        end = self.time + n * self.dt
+        self.collisions = self._advance(end)
+        self.time = end
+        self.step_count += n
+        self._sync()
+        if self.collision_stats is not None:
+            hits = np.array(self._hits, dtype=np.intp).reshape(-1, 2)
+            self.collision_stats.update(hits[:, 0], hits[:, 1], self.speeds(), n * self.dt)
+            self._hits.clear()
+        return self
+
+    def set_state(self, x, y, vx, vy):
+        super().set_state(x, y, vx, vy)
+        self.reset_events()
+
+    def observables(self):
+        obs = super().observables()
+        # no candidate pairs here, events are the unit of work
+        obs["pairs_tested"] = None
+        obs["events"] = self.events
+        return obs
+
+    # --- event loop ---
+
+    def _advance(self, end):
+        queue, count = self._queue, self._count
+        collisions = events = 0
+        while queue and queue[0][0] <= end:
+            t, kind, i, j, ci, cj = heapq.heappop(queue)
+            if count[i] != ci or (kind == PAIR and count[j] != cj):
+                continue  # invalidated by a later collision
+            self.clock = t
+            events += 1
+            if kind == PAIR:
+                self._collide(i, j)
+                collisions += 1
+                if self.collision_stats is not None:
+                    self._hits.append((i, j))
+            elif kind == CELL:
+                self._cross(i, j)
+            else:
+                self._bounce(i, kind)
+        self.events = events
+        self.clock = end
+        return collisions
+
+    def _move(self, i):
+        dt = self.clock - self._t[i]
+        if dt:
+            self._x[i] += self._vx[i] * dt
+            self._y[i] += self._vy[i] * dt
+            self._t[i] = self.clock
+
+    def _collide(self, i, j):
+        self._move(i)
+        self._move(j)
+        dx = self._x[j] - self._x[i]
+        dy = self._y[j] - self._y[i]
+        dist = math.hypot(dx, dy)
+        nx, ny = dx / dist, dy / dist
+        # component of relative speed along collision line, v1' = v1 - dvn*n
+        dvn = (self._vx[i] - self._vx[j]) * nx + (self._vy[i] - self._vy[j]) * ny
+        self._vx[i] -= dvn * nx
+        self._vy[i] -= dvn * ny
+        self._vx[j] += dvn * nx
+        self._vy[j] += dvn * ny
+        for k in (i, j):
+            self._count[k] += 1
+            self._predict_walls(k)
+            self._predict_cell(k)
+            self._predict_pairs(k, self._neighbour_cells(k))
+
+    def _bounce(self, i, kind):
+        self._move(i)
+        r = self.radius
+        if kind == WALL_X:
+            self.wall_impulse[0 if self._vx[i] < 0 else 1] += 2 * abs(self._vx[i])
+            self._vx[i] = -self._vx[i]
+            self._x[i] = max(r, min(self._x[i], self.width - r))
+        else:
+            self.wall_impulse[2 if self._vy[i] < 0 else 3] += 2 * abs(self._vy[i])
+            self._vy[i] = -self._vy[i]
+            self._y[i] = max(r, min(self._y[i], self.height - r))
+        self._count[i] += 1
+        self._predict_walls(i)
+        self._predict_cell(i)
+        self._predict_pairs(i, self._neighbour_cells(i))
+
+    def _cross(self, i, direction):
+        self._move(i)
+        grid_h = self.grid.grid_h
+        gx, gy = self._gx[i], self._gy[i]
+        self._cells[gx * grid_h + gy].discard(i)
+        if direction == RIGHT:
+            gx += 1
+            fresh = [(gx + 1, gy + d) for d in (-1, 0, 1)]
+        elif direction == LEFT:
+            gx -= 1
+            fresh = [(gx - 1, gy + d) for d in (-1, 0, 1)]
+        elif direction == UP:
+            gy += 1
+            fresh = [(gx + d, gy + 1) for d in (-1, 0, 1)]
+        else:
+            gy -= 1
+            fresh = [(gx + d, gy - 1) for d in (-1, 0, 1)]
+        self._gx[i], self._gy[i] = gx, gy
+        self._cells[gx * grid_h + gy].add(i)
+        # the velocity did not change, events already queued stay valid and
+        # only the cells that just became neighbours need predictions
+        self._predict_cell(i)
+        self._predict_pairs(i, self._valid_cells(fresh))
+
+    # --- predictions ---
+
+    def _push(self, t, kind, i, j=-1, cj=0):
+        heapq.heappush(self._queue, (t, kind, i, j, self._count[i], cj))
+
+    def _predict_walls(self, i):
+        r = self.radius
+        vx, vy = self._vx[i], self._vy[i]
+        if vx > 0:
+            self._push(self.clock + max(0.0, (self.width - r - self._x[i]) / vx), WALL_X, i)
+        elif vx < 0:
+            self._push(self.clock + max(0.0, (r - self._x[i]) / vx), WALL_X, i)
+        if vy > 0:
+            self._push(self.clock + max(0.0, (self.height - r - self._y[i]) / vy), WALL_Y, i)
+        elif vy < 0:
+            self._push(self.clock + max(0.0, (r - self._y[i]) / vy), WALL_Y, i)
+
+    def _predict_cell(self, i):
+        cs = self.grid.cell_size
+        gx, gy = self._gx[i], self._gy[i]
+        vx, vy = self._vx[i], self._vy[i]
+        best, direction = math.inf, None
+        if vx > 0 and gx + 1 < self.grid.grid_w:
+            best, direction = ((gx + 1) * cs - self._x[i]) / vx, RIGHT
+        elif vx < 0 and gx > 0:
+            best, direction = (gx * cs - self._x[i]) / vx, LEFT
+        if vy > 0 and gy + 1 < self.grid.grid_h:
+            t = ((gy + 1) * cs - self._y[i]) / vy
+            if t < best:
+                best, direction = t, UP
+        elif vy < 0 and gy > 0:
+            t = (gy * cs - self._y[i]) / vy
+            if t < best:
+                best, direction = t, DOWN
+        if direction is not None:
+            self._push(self.clock + max(0.0, best), CELL, i, direction)
+
+    def _neighbour_cells(self, i):
+        gx, gy = self._gx[i], self._gy[i]
+        return self._valid_cells([(gx + dx, gy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+
+    def _valid_cells(self, cells):
+        grid = self.grid
+        return [self._cells[gx * grid.grid_h + gy] for gx, gy in cells
+                if 0 <= gx < grid.grid_w and 0 <= gy < grid.grid_h]
+
+    def _predict_pairs(self, i, cells, later_only=False):
+        # i is at the current clock, partners are moved there on the fly
+        x, y, vx, vy, t = self._x, self._y, self._vx, self._vy, self._t
+        now = self.clock
+        sigma2 = 4 * self.radius * self.radius
+        xi, yi, vxi, vyi = x[i], y[i], vx[i], vy[i]
+        for cell in cells:
+            for j in cell:
+                if j == i or (later_only and j < i):
+                    continue
+                dvx = vx[j] - vxi
+                dvy = vy[j] - vyi
+                dt = now - t[j]
+                dx = x[j] + vx[j] * dt - xi
+                dy = y[j] + vy[j] * dt - yi
+                b = dx * dvx + dy * dvy
+                if b >= 0:
+                    continue  # getting further from each other
+                dr2 = dx * dx + dy * dy - sigma2
+                if dr2 <= 0:
+                    hit = 0.0  # already touching and approaching
+                else:
+                    dv2 = dvx * dvx + dvy * dvy
+                    disc = b * b - dv2 * dr2
+                    if disc < 0:
+                        continue  # they miss each other
+                    hit = dr2 / (math.sqrt(disc) - b)
+                self._push(now + hit, PAIR, i, j, self._count[j])
+
+    def _sync(self):
+        # positions of all particles at the current time into the arrays
+        p = self.particles
+        dt = self.clock - np.asarray(self._t)
+        p.x[:] = np.asarray(self._x) + np.asarray(self._vx) * dt
+        p.y[:] = np.asarray(self._y) + np.asarray(self._vy) * dt
+        p.vx[:] = self._vx
+        p.vy[:] = self._vy
@@ -0,0 +1,358 @@
+import collections
+import math
+
+import numpy as np
+
+from .broadphase import CellGrid
+from .particles import minimum_image
+
+
+def maxwell_boltzmann_2d(v, kT):
+    # speed distribution of a 2D ideal gas with m = k = 1
+    return v / kT * np.exp(-v * v / (2 * kT))
+
+
+class SpeedHistogram:
+    """Speed histogram on fixed bins, compared with Maxwell-Boltzmann.
+
+    update() bins the current speeds with np.bincount, O(N) without Python
+    loops, and adds them to a running total; speeds beyond v_max land in the
+    last bin. expected() integrates the 2D Maxwell-Boltzmann distribution of
+    the current temperature kT = E / N over the same bins.
+    """
+
+    def __init__(self, v_max, bins=40):
+        if v_max <= 0 or bins < 1:
+            raise ValueError("v_max must be positive and bins at least 1")
+        self.v_max = v_max
+        self.bins = bins
+        self.bin_width = v_max / bins
+        self.edges = np.linspace(0, v_max, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)  # last update
+        self.total = np.zeros(bins, dtype=np.int64)  # all updates
+        self.samples = 0
+        self.kT = None
+
+    def update(self, speeds):
+        index = (speeds / self.bin_width).astype(np.intp)
+        np.minimum(index, self.bins - 1, out=index)
+        self.counts = np.bincount(index, minlength=self.bins)
+        self.total += self.counts
+        self.samples += 1
+        speeds = speeds.astype(np.float64, copy=False)
+        self.kT = 0.5 * float(np.dot(speeds, speeds)) / max(1, len(speeds))
+        return self
+
+    def reset(self):
+        self.total[:] = 0
+        self.samples = 0
+
+    def density(self, accumulated=False):
+        # probability per unit speed, comparable with maxwell_boltzmann_2d
+        counts = self.total if accumulated else self.counts
+        return counts / max(1, counts.sum()) / self.bin_width
+
+    def expected(self, kT=None):
+        # bin probabilities from the CDF 1 - exp(-v^2 / 2kT), tail in the last bin
+        kT = self.kT if kT is None else kT
+        cdf = 1 - np.exp(-self.edges ** 2 / (2 * kT))
+        cdf[-1] = 1.0
+        return np.diff(cdf) / self.bin_width
+
+    def deviation(self, accumulated=False):
+        # total variation distance between measured and expected bins, 0..1
+        return 0.5 * float(np.abs(self.density(accumulated) - self.expected()).sum()) * self.bin_width
+
+
+class PressureMeter:
+    """Wall pressure from the momentum the walls received, over a sliding window.
+
+    sample() stores (time, sim.wall_impulse) and keeps the last window + 1
+    samples, so pressure() is the mean force per unit wall length between
+    the oldest and the newest sample. Centres of the disks stay radius away
+    from the walls, the box they move in is (width - 2r) x (height - 2r) and
+    both the wall lengths and the area V use it.
+    """
+
+    def __init__(self, sim, window=10):
+        if window < 1:
+            raise ValueError("window must be at least one sample")
+        if sim.periodic:
+            raise ValueError("a periodic box has no walls to measure the pressure on")
+        self.sim = sim
+        self.samples = collections.deque(maxlen=window + 1)
+        self.sample()
+
+    def box(self):
+        r = self.sim.radius
+        return self.sim.width - 2 * r, self.sim.height - 2 * r
+
+    def sample(self):
+        self.samples.append((self.sim.time, self.sim.wall_impulse.copy()))
+        return self
+
+    def wall_pressures(self):
+        # pressure on each wall (particles.WALLS order), None before two samples
+        (t0, first), (t1, last) = self.samples[0], self.samples[-1]
+        if t1 <= t0:
+            return None
+        w, h = self.box()
+        return (last - first) / (t1 - t0) / np.array([h, h, w, w])
+
+    def pressure(self):
+        (t0, first), (t1, last) = self.samples[0], self.samples[-1]
+        if t1 <= t0:
+            return None
+        w, h = self.box()
+        return float((last - first).sum()) / (t1 - t0) / (2 * (w + h))
+
+    def compressibility(self):
+        # PV / NkT, 1 for an ideal gas and above it for finite disks
+        pressure = self.pressure()
+        if pressure is None:
+            return None
+        w, h = self.box()
+        return pressure * w * h / self.sim.kinetic_energy()  # NkT = E in 2D
+
+
+class RadialDistribution:
+    """Pair correlation function g(r) up to r_max, accumulated over samples.
+
+    Pairs come from a CellGrid with cells of r_max, so only particles in the
+    same or adjacent cells are looked at. The normalisation is the exact
+    pair distance distribution of an ideal gas in the same finite box,
+    (W - 2r) x (H - 2r) for the disk centres, instead of the infinite system
+    2 pi r dr / A, which would make g(r) sag near r_max: g = 1 for an ideal
+    gas at every r below the box size. A periodic box has no edges, there
+    distances use the minimum image and 2 pi r dr / A is exact.
+    """
+
+    def __init__(self, width, height, r_max, bins=100, radius=0.0, periodic=False):
+        self.periodic = periodic
+        self.box = (width, height) if periodic else (width - 2 * radius, height - 2 * radius)
+        # beyond half the periodic box a pair would also be seen through the seam
+        if not 0 < r_max <= min(self.box) / (2 if periodic else 1):
+            raise ValueError("r_max must be positive and fit into the box")
+        self.r_max = r_max
+        self.bins = bins
+        self.bin_width = r_max / bins
+        self.edges = np.linspace(0, r_max, bins + 1)
+        # the torus grid needs at least 3 x 4 cells of r_max
+        self.grid = CellGrid(width, height, r_max, periodic)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.samples = 0
+        self.num_particles = None
+
+    def update(self, x, y):
+        i, j = self.grid.build(x, y).pairs()
+        dx = x[j] - x[i]
+        dy = y[j] - y[i]
+        if self.periodic:
+            dx, dy = minimum_image(dx, self.box[0]), minimum_image(dy, self.box[1])
+        dist = np.sqrt(dx * dx + dy * dy)
+        index = (dist[dist < self.r_max] / self.bin_width).astype(np.intp)
+        self.counts += np.bincount(index, minlength=self.bins)[:self.bins]
+        self.samples += 1
+        self.num_particles = len(x)
+        return self
+
+    def ideal_pairs(self):
+        # fraction of uniformly placed pairs per bin, from the angle averaged
+        # overlap of the box with itself shifted by r: A - 2r(W + H)/pi + r^2/pi
+        w, h = self.box
+        area = w * h
+        r = self.edges
+        if self.periodic:
+            return np.diff(np.pi * r ** 2) / area
+        cumulative = (np.pi * r ** 2 * area - 4 / 3 * r ** 3 * (w + h) + r ** 4 / 2) / area ** 2
+        return np.diff(cumulative)
+
+    def centres(self):
+        return self.edges[:-1] + self.bin_width / 2
+
+    def g(self):
+        if not self.samples:
+            return np.zeros(self.bins)
+        n = self.num_particles
+        expected = self.samples * n * (n - 1) / 2 * self.ideal_pairs()
+        return self.counts / expected
+
+
+class UnfoldedDisplacement:
+    """Displacement of every particle with the walls treated as mirrors.
+
+    A wall bounce flips the sign with which later moves of that particle
+    along that axis are counted, which follows the mirror image behind the
+    wall instead of the particle. The result is the trajectory in an
+    unbounded box, whose mean squared displacement keeps growing instead of
+    saturating at the box size. The fixed-step engine calls flight() after
+    integrating, before the walls, and mark() / collided() around the
+    collision pass, which moves overlapping particles apart. In a periodic
+    box there are no mirrors, wrapping leaves the displacement alone.
+    """
+
+    def __init__(self, num_particles):
+        self.dx = np.zeros(num_particles)
+        self.dy = np.zeros(num_particles)
+        self.sx = np.ones(num_particles)
+        self.sy = np.ones(num_particles)
+        self._x = np.empty(num_particles)
+        self._y = np.empty(num_particles)
+
+    def flight(self, x, y, vx, vy, dt, radius, width, height, periodic=False):
+        self.dx += self.sx * vx * dt
+        self.dy += self.sy * vy * dt
+        if periodic:
+            return
+        # particles the walls are about to reflect continue as mirror images
+        np.negative(self.sx, out=self.sx, where=(x - radius < 0) | (x + radius > width))
+        np.negative(self.sy, out=self.sy, where=(y - radius < 0) | (y + radius > height))
+
+    def mark(self, x, y):
+        # a plain copy, cheaper than gathering the particles of the
+        # candidate pairs, which are not known to collide yet
+        np.copyto(self._x, x)
+        np.copyto(self._y, y)
+
+    def collided(self, x, y, hit_i, hit_j):
+        # only the particles of resolved pairs were moved apart
+        moved = np.unique(np.concatenate((hit_i, hit_j)))
+        self.dx[moved] += self.sx[moved] * (x[moved] - self._x[moved])
+        self.dy[moved] += self.sy[moved] * (y[moved] - self._y[moved])
+
+
+class MeanSquaredDisplacement:
+    """MSD over every time origin in a sliding window, computed with FFTs.
+
+    sample() stores the unfolded displacements of the simulation (it needs
+    track_displacement=True) in a ring of window samples, taken at equal
+    time intervals. msd() averages |r(t + tau) - r(t)|^2 over all particles
+    and all origins t in the window in O(T log T) per particle: the squares
+    come from prefix sums and the cross term r(t) . r(t + tau) from one
+    zero-padded FFT autocorrelation, summed over particles before the
+    inverse transform. particles selects a subset to bound the memory of
+    window x n x 2 floats.
+    """
+
+    def __init__(self, window=256, particles=None):
+        if window < 2:
+            raise ValueError("window must hold at least two samples")
+        self.window = window
+        self.particles = particles
+        self.history = None
+        self.times = np.zeros(window)
+        self.count = 0
+
+    def sample(self, sim):
+        unfolded = sim.unfolded
+        if unfolded is None:
+            raise ValueError("the simulation does not track displacements")
+        dx, dy = unfolded.dx, unfolded.dy
+        if self.particles is not None:
+            dx, dy = dx[self.particles], dy[self.particles]
+        if self.history is None:
+            self.history = np.zeros((self.window, len(dx), 2))
+        slot = self.count % self.window
+        self.history[slot, :, 0] = dx
+        self.history[slot, :, 1] = dy
+        self.times[slot] = sim.time
+        self.count += 1
+        return self
+
+    def _ordered(self):
+        t = min(self.count, self.window)
+        if self.count <= self.window:
+            return self.history[:t], self.times[:t]
+        start = self.count % self.window
+        order = np.r_[start:self.window, 0:start]
+        return self.history[order], self.times[order]
+
+    def lags(self):
+        # time of every lag, assuming equally spaced samples
+        r, times = self._ordered()
+        return times - times[0]
+
+    def msd(self):
+        r, _ = self._ordered()
+        t, n = r.shape[0], r.shape[1]
+        if t < 2:
+            return np.zeros(t)
+        squares = np.einsum("tnd,tnd->t", r, r)
+        prefix = np.concatenate(([0.0], np.cumsum(squares)))
+        m = np.arange(t)
+        # sum over origins of |r(t)|^2 + |r(t + m)|^2
+        s1 = prefix[t - m] + (prefix[t] - prefix[m])
+        spectrum = np.fft.rfft(r, n=2 * t, axis=0)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).sum(axis=(1, 2))
+        cross = np.fft.irfft(power, n=2 * t)[:t]
+        return (s1 - 2 * cross) / ((t - m) * n)
+
+    def diffusion(self, fit=(0.1, 0.5)):
+        """Self-diffusion coefficient D from MSD = 4 D tau (2D).
+
+        The slope is fitted over the lags between the fractions fit of the
+        window: short lags are still ballistic, long ones have few origins.
+        """
+        lags, msd = self.lags(), self.msd()
+        lo, hi = int(fit[0] * len(lags)), max(int(fit[1] * len(lags)), int(fit[0] * len(lags)) + 2)
+        if hi > len(lags):
+            return None
+        slope = np.polyfit(lags[lo:hi], msd[lo:hi], 1)[0]
+        return slope / 4
+
+
+class CollisionStats:
+    """Per-particle collision counters and travelled distance from hit pairs.
+
+    update() takes the pairs a collision pass resolved and adds them to the
+    counters with np.bincount; the distance every particle travelled (speed
+    * dt) goes into its accumulator, both O(N) without Python loops. The
+    free path of particle k is distance[k] / counts[k]. Rates and paths are
+    compared with kinetic theory of hard disks of diameter d at number
+    density n: the collision width is 2d and the mean relative speed
+    sqrt(2) v_mean, so z = 2 sqrt(2) n d v_mean with v_mean = sqrt(pi kT / 2)
+    and lambda = v_mean / z, with z times the Enskog contact value
+    g(d) = (1 - 7 eta / 16) / (1 - eta)^2 for denser gases.
+    """
+
+    def __init__(self, num_particles):
+        self.counts = np.zeros(num_particles, dtype=np.int64)
+        self.distance = np.zeros(num_particles)
+        self.time = 0.0
+
+    def update(self, hit_i, hit_j, speeds, dt):
+        self.distance += speeds * dt
+        self.time += dt
+        if len(hit_i):
+            self.counts += np.bincount(np.concatenate((hit_i, hit_j)), minlength=len(self.counts))
+
+    def collision_rate(self):
+        # collisions per particle per unit time
+        if self.time == 0:
+            return None
+        return float(self.counts.sum()) / (len(self.counts) * self.time)
+
+    def mean_free_path(self):
+        # distance travelled per particle collision
+        total = int(self.counts.sum())
+        return float(self.distance.sum()) / total if total else None
+
+    def free_paths(self):
+        # per particle, inf for particles that did not collide yet
+        with np.errstate(divide="ignore"):
+            return self.distance / self.counts
+
+    def expected(self, sim, enskog=True):
+        """Kinetic theory collision rate and mean free path for sim."""
+        d = 2 * sim.radius
+        w, h = sim.width, sim.height
+        if not sim.periodic:
+            w, h = w - d, h - d  # the box of the centres
+        n = len(sim) / (w * h)
+        contact = 1.0
+        if enskog:
+            eta = len(sim) * np.pi * sim.radius ** 2 / (sim.width * sim.height)
+            contact = (1 - 7 * eta / 16) / (1 - eta) ** 2
+        v_mean = math.sqrt(math.pi * sim.temperature() / 2)
+        rate = 2 * math.sqrt(2) * n * d * v_mean * contact
+        return rate, v_mean / rate
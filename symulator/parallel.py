@@ -0,0 +1,303 @@
+import multiprocessing as mp
+import os
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .broadphase import CellGrid
+from .engine import Simulation
+from .particles import reflect_walls, resolve_pairs
+
+FIELDS = ("x", "y", "vx", "vy")
+LEFT, RIGHT = 0, 1
+
+
+class ParallelSimulation(Simulation):
+    """Simulation split into vertical strips of grid columns, one process each.
+
+    The particle arrays live in multiprocessing.shared_memory. Every worker
+    integrates the particles it owns, hands the ones that left its strip to
+    the new owner, publishes the particles of its first and last column as
+    ghosts for the neighbouring strips and resolves the pairs whose home cell
+    lies in its strip. Even strips collide first and odd strips second: with
+    strips at least two columns wide two strips of one parity never touch the
+    same column, so no particle is written by two processes at once.
+    """
+
+    def __init__(self, num_particles, max_speed, workers=None, **kwargs):
+        super().__init__(num_particles, max_speed, **kwargs)
+        if self.neighbours is not None or self.pool is not None:
+            raise ValueError("the parallel engine does not use neighbour lists or threads")
+        if self.periodic:
+            raise ValueError("the parallel engine has no periodic box")
+        if self.backend.name != "numpy":
+            raise ValueError("the parallel engine runs the numpy kernels only")
+        if self.unfolded is not None:
+            raise ValueError("the parallel engine does not track displacements")
+        if self.collision_stats is not None:
+            raise ValueError("the parallel engine does not count collisions per particle")
+        grid_w = self.grid.grid_w
+        workers = os.cpu_count() if workers is None else workers
+        self.workers = max(1, min(workers, grid_w // 2))
+        # strip k covers grid columns bounds[k]:bounds[k + 1]
+        self.bounds = np.linspace(0, grid_w, self.workers + 1).astype(np.intp)
+
+        n = len(self.particles)
+        capacity = min(n, 4 * n // self.workers + 1024)
+        self._shm = []
+        for name in FIELDS:
+            array = self._shared((n,), self.particles.dtype)
+            array[:] = getattr(self.particles, name)
+            setattr(self.particles, name, array)
+        self._migrant_count = self._shared((self.workers,), np.int64)
+        self._migrant_index = self._shared((self.workers, capacity), np.int32)
+        self._migrant_dest = self._shared((self.workers, capacity), np.int32)
+        self._edge_count = self._shared((self.workers, 2), np.int64)
+        self._edge_index = self._shared((self.workers, 2, capacity), np.int32)
+        self._stats = self._shared((self.workers, 2), np.int64)
+        self._impulse = self._shared((self.workers, 4), np.float64)
+
+        ctx = mp.get_context()
+        barrier = ctx.Barrier(self.workers)
+        setup = {
+            "names": [shm.name for shm in self._shm],
+            "num_particles": n,
+            "dtype": self.particles.dtype.str,
+            "capacity": capacity,
+            "workers": self.workers,
+            "bounds": self.bounds,
+            "width": self.width,
+            "height": self.height,
+            "radius": self.radius,
+            "cell_size": self.cell_size,
+            "dt": self.dt,
+        }
+        self._pipes = []
+        self._processes = []
+        for rank in range(self.workers):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_worker, args=(rank, setup, barrier, child), daemon=True)
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._processes.append(process)
+        self._lock = threading.Lock()
+        # every strip has to own its particles before anybody moves them
+        self._collect()
+
+    def _shared(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(shape)) * dtype.itemsize)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        self._shm.append(shm)
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    def _command(self, *message):
+        with self._lock:
+            for pipe in self._pipes:
+                pipe.send(message)
+            self._collect()
+
+    def _collect(self):
+        replies = [pipe.recv() for pipe in self._pipes]
+        errors = [reply[1] for reply in replies if reply[0] == "error"]
+        if errors:
+            raise RuntimeError("parallel worker failed: " + "; ".join(errors))
+
+    def step(self, n=1):
+        if n <= 0:
+            return self
+        self._command("step", n)
+        self.pairs_tested = int(self._stats[:, 0].sum())
+        self.collisions = int(self._stats[:, 1].sum())
+        self.wall_impulse += self._impulse.sum(axis=0)
+        self._impulse[:] = 0
+        self.step_count += n
+        self.time += n * self.dt
+        return self
+
+    def reassign(self):
+        # call after changing the particle arrays from outside the workers
+        self._command("reassign")
+
+    def set_state(self, x, y, vx, vy):
+        super().set_state(x, y, vx, vy)
+        self.reassign()
+
+    def parameters(self):
+        params = super().parameters()
+        params["workers"] = self.workers
+        return params
+
+    def close(self):
+        super().close()
+        if not self._processes:
+            return
+        for pipe in self._pipes:
+            try:
+                pipe.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        # keep private copies, the shared blocks go away
+        for name in FIELDS:
+            setattr(self.particles, name, getattr(self.particles, name).copy())
+        for shm in self._shm:
+            shm.close()
+            shm.unlink()
+        self._shm = []
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class _Strip:
+    # worker side state of one strip
+
+    def __init__(self, rank, setup):
+        self.rank = rank
+        self.setup = setup
+        self.workers = setup["workers"]
+        n, capacity = setup["num_particles"], setup["capacity"]
+        self.blocks = [shared_memory.SharedMemory(name=name) for name in setup["names"]]
+        dtype = np.dtype(setup["dtype"])
+        self.x, self.y, self.vx, self.vy = (
+            np.ndarray((n,), dtype=dtype, buffer=block.buf) for block in self.blocks[:4])
+        shapes = [((self.workers,), np.int64), ((self.workers, capacity), np.int32),
+                  ((self.workers, capacity), np.int32), ((self.workers, 2), np.int64),
+                  ((self.workers, 2, capacity), np.int32), ((self.workers, 2), np.int64),
+                  ((self.workers, 4), np.float64)]
+        (self.migrant_count, self.migrant_index, self.migrant_dest,
+         self.edge_count, self.edge_index, self.stats, self.impulse) = (
+            np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            for (shape, dtype), block in zip(shapes, self.blocks[4:]))
+        self.capacity = capacity
+
+        self.bounds = setup["bounds"]
+        self.c0, self.c1 = int(self.bounds[rank]), int(self.bounds[rank + 1])
+        self.global_grid = CellGrid(setup["width"], setup["height"], setup["cell_size"])
+        cs = setup["cell_size"]
+        # local grid: the strip plus one ghost column on each side
+        self.local_grid = CellGrid((self.c1 - self.c0 + 2) * cs, setup["height"], cs)
+        self.reassign()
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+
+    def columns(self, index):
+        return self.global_grid.cell_ids(self.x[index], self.y[index]) // self.global_grid.grid_h
+
+    def strip_of(self, columns):
+        return np.searchsorted(self.bounds, columns, side="right") - 1
+
+    def reassign(self):
+        everyone = np.arange(len(self.x))
+        self.own = everyone[self.strip_of(self.columns(everyone)) == self.rank]
+
+    def step(self, barrier):
+        s, own = self.setup, self.own
+        r, width, height = s["radius"], s["width"], s["height"]
+
+        # 1. position update and walls of the owned particles
+        x, y, vx, vy = self.x[own], self.y[own], self.vx[own], self.vy[own]
+        x += vx * s["dt"]
+        y += vy * s["dt"]
+        reflect_walls(x, y, vx, vy, r, width, height, self.impulse[self.rank])
+        self.x[own], self.y[own], self.vx[own], self.vy[own] = x, y, vx, vy
+
+        # 2. particles that crossed the strip border go to their new owner
+        columns = self.columns(own)
+        dest = self.strip_of(columns)
+        leaving = dest != self.rank
+        k = int(leaving.sum())
+        self._check(k, "migrating particles")
+        self.migrant_index[self.rank, :k] = own[leaving]
+        self.migrant_dest[self.rank, :k] = dest[leaving]
+        self.migrant_count[self.rank] = k
+        own, columns = own[~leaving], columns[~leaving]
+        barrier.wait()
+
+        arrivals = [own]
+        for other in range(self.workers):
+            count = self.migrant_count[other]
+            if other != self.rank and count:
+                mine = self.migrant_dest[other, :count] == self.rank
+                arrivals.append(self.migrant_index[other, :count][mine].astype(np.intp))
+        # sorted ownership keeps the pair order independent of arrival order
+        own = self.own = np.sort(np.concatenate(arrivals))
+        columns = self.columns(own)
+
+        # 3. first and last column are ghosts for the neighbouring strips
+        for side, column in ((LEFT, self.c0), (RIGHT, self.c1 - 1)):
+            edge = own[columns == column]
+            self._check(len(edge), "ghost particles")
+            self.edge_index[self.rank, side, :len(edge)] = edge
+            self.edge_count[self.rank, side] = len(edge)
+        barrier.wait()
+
+        ghosts = []
+        if self.rank > 0:
+            ghosts.append(self.edge_index[self.rank - 1, RIGHT, :self.edge_count[self.rank - 1, RIGHT]])
+        if self.rank + 1 < self.workers:
+            ghosts.append(self.edge_index[self.rank + 1, LEFT, :self.edge_count[self.rank + 1, LEFT]])
+        local = np.concatenate([own] + [g.astype(np.intp) for g in ghosts])
+
+        # 4. pairs whose home cell lies in this strip
+        cell = self.global_grid.cell_ids(self.x[local], self.y[local])
+        grid_h = self.global_grid.grid_h
+        local_column = cell // grid_h - (self.c0 - 1)
+        grid = self.local_grid.assign(local_column * grid_h + cell % grid_h)
+        li, lj = grid.pairs()
+        home = local_column[li]
+        keep = (home >= 1) & (home <= self.c1 - self.c0)
+        pairs_i, pairs_j = local[li[keep]], local[lj[keep]]
+        barrier.wait()  # nobody moves ghosts before all strips read them
+
+        # 5. collisions, even strips first, then odd strips
+        hits = 0
+        for parity in (0, 1):
+            if self.rank % 2 == parity:
+                hit_i, _ = resolve_pairs(self.x, self.y, self.vx, self.vy, pairs_i, pairs_j, r)
+                hits = len(hit_i)
+            barrier.wait()
+        self.stats[self.rank] = len(pairs_i), hits
+
+    def _check(self, count, what):
+        if count > self.capacity:
+            raise RuntimeError(f"strip {self.rank}: {count} {what} exceed the buffer of {self.capacity}")
+
+
+def _worker(rank, setup, barrier, pipe):
+    try:
+        strip = _Strip(rank, setup)
+    except Exception as exc:
+        pipe.send(("error", f"{type(exc).__name__}: {exc}"))
+        return
+    pipe.send(("ok",))
+    try:
+        while True:
+            message = pipe.recv()
+            if message[0] == "stop":
+                break
+            try:
+                if message[0] == "step":
+                    for _ in range(message[1]):
+                        strip.step(barrier)
+                elif message[0] == "reassign":
+                    strip.reassign()
+                pipe.send(("ok",))
+            except Exception as exc:
+                barrier.abort()  # wake up the other workers instead of hanging
+                pipe.send(("error", f"{type(exc).__name__}: {exc}"))
+                break
+    finally:
+        strip.close()
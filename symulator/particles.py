@@ -0,0 +1,318 @@
+import math
+
+import numpy as np
+
+from .config import WIDTH, HEIGHT, PARTICLE_RADIUS, DT
+from .placement import PLACEMENTS
+
+DTYPES = (np.float32, np.float64)
+# order of the walls in impulse arrays
+WALLS = ("x_min", "x_max", "y_min", "y_max")
+
+
+class ParticleSystem:
+    """Struct of arrays: x, y, vx, vy live in contiguous NumPy arrays.
+
+    Indexing or iterating yields ParticleView objects that behave like the old
+    per-object Particle, so scalar code keeps working while the hot paths use
+    the vectorized methods.
+    """
+
+    def __init__(self, num_particles, width=WIDTH, height=HEIGHT,
+                 radius=PARTICLE_RADIUS, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        if self.dtype.type not in DTYPES:
+            raise ValueError(f"unsupported dtype {self.dtype}, use float32 or float64")
+        self.width = width
+        self.height = height
+        self.radius = radius
+        self.x = np.zeros(num_particles, dtype=self.dtype)
+        self.y = np.zeros(num_particles, dtype=self.dtype)
+        self.vx = np.zeros(num_particles, dtype=self.dtype)
+        self.vy = np.zeros(num_particles, dtype=self.dtype)
+
+    @classmethod
+    def from_arrays(cls, x, y, vx, vy, **kwargs):
+        system = cls(len(x), **kwargs)
+        system.x[:] = x
+        system.y[:] = y
+        system.vx[:] = vx
+        system.vy[:] = vy
+        return system
+
+    @classmethod
+    def random(cls, num_particles, max_speed, rng=None, placement="random", **kwargs):
+        # same distribution as the original simulate(): uniform position,
+        # uniform direction, speed from 1 to max_speed; placement picks a
+        # non-overlapping alternative for the positions from PLACEMENTS
+        if placement not in PLACEMENTS:
+            raise ValueError(f"unknown placement {placement!r}, choose from {sorted(PLACEMENTS)}")
+        rng = np.random.default_rng() if rng is None else rng
+        system = cls(num_particles, **kwargs)
+        system.x[:], system.y[:] = PLACEMENTS[placement](
+            num_particles, system.width, system.height, system.radius, rng)
+        angle = rng.uniform(0, 2 * math.pi, num_particles)
+        speed = rng.uniform(1, max_speed, num_particles)
+        system.vx[:] = speed * np.cos(angle)
+        system.vy[:] = speed * np.sin(angle)
+        return system
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, index):
+        n = len(self.x)
+        index = int(index)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("particle index out of range")
+        return ParticleView(self, index)
+
+    def __iter__(self):
+        for i in range(len(self.x)):
+            yield ParticleView(self, i)
+
+    def integrate(self, dt=DT):  # s=vt for every particle at once
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+
+    def check_walls(self):  # bouncing off the walls
+        reflect_walls(self.x, self.y, self.vx, self.vy, self.radius, self.width, self.height)
+
+    def collide_pairs(self, i, j):
+        return resolve_pairs(self.x, self.y, self.vx, self.vy, i, j, self.radius)
+
+    def speeds(self):
+        return np.hypot(self.vx, self.vy)
+
+    def kinetic_energy(self):
+        # accumulate in float64 so float32 storage does not drift the total
+        vx = self.vx.astype(np.float64, copy=False)
+        vy = self.vy.astype(np.float64, copy=False)
+        return 0.5 * float(np.dot(vx, vx) + np.dot(vy, vy))
+
+
+def reflect_walls(x, y, vx, vy, radius, width, height, impulse=None):
+    # impulse: optional float64 array of 4, gets the momentum given to each
+    # wall (in WALLS order), 2 |v| per bounce for m = 1
+    low_x, high_x = x - radius < 0, x + radius > width
+    low_y, high_y = y - radius < 0, y + radius > height
+    hit_x = low_x | high_x
+    hit_y = low_y | high_y
+    if impulse is not None:
+        for k, hit, v in ((0, low_x, vx), (1, high_x, vx), (2, low_y, vy), (3, high_y, vy)):
+            impulse[k] += 2 * float(np.abs(v[hit]).sum(dtype=np.float64))
+    np.negative(vx, out=vx, where=hit_x)
+    np.negative(vy, out=vy, where=hit_y)
+    # particles inside the box are unaffected by the clamp
+    np.clip(x, radius, width - radius, out=x)
+    np.clip(y, radius, height - radius, out=y)
+
+
+def wrap_positions(x, y, width, height):
+    # periodic box: whatever left through one side comes back at the other
+    np.remainder(x, width, out=x)
+    np.remainder(y, height, out=y)
+
+
+def minimum_image(d, length):
+    # separation to the nearest periodic image along an axis of that length
+    return d - length * np.floor(d / length + 0.5)
+
+
+def _first_use(i, j):
+    # True for pairs where neither particle appears in an earlier pair
+    m = len(i)
+    ends = np.concatenate((i, j))
+    rank = np.concatenate((np.arange(m), np.arange(m)))
+    order = np.lexsort((rank, ends))
+    sorted_ends = ends[order]
+    first = np.empty(2 * m, dtype=bool)
+    first[order] = np.concatenate(([True], sorted_ends[1:] != sorted_ends[:-1]))
+    return first[:m] & first[m:]
+
+
+def resolve_pairs(x, y, vx, vy, i, j, radius, box=None):
+    """Elastic collisions of equal masses for candidate pairs (i, j).
+
+    Pairs not overlapping on entry are dropped, the rest give the same result
+    as calling collide_with on them one by one in order: every round resolves,
+    all at once, the pairs whose particles are not used by an earlier pair
+    still waiting. Returns the pairs that collided. With box = (width,
+    height) the box is periodic and separations use the minimum image.
+    """
+    if np.any(i == j):
+        raise ValueError("a particle cannot collide with itself")
+    diameter2 = 4 * radius * radius
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    if box is not None:
+        dx, dy = minimum_image(dx, box[0]), minimum_image(dy, box[1])
+    close = dx * dx + dy * dy < diameter2  # lack of collision for the rest
+    i, j = i[close], j[close]
+    hit_i, hit_j = [], []
+    while len(i):
+        free = _first_use(i, j)
+        a, b = i[free], j[free]
+        i, j = i[~free], j[~free]
+
+        dx = x[b] - x[a]
+        dy = y[b] - y[a]
+        if box is not None:
+            dx, dy = minimum_image(dx, box[0]), minimum_image(dy, box[1])
+        dist = np.sqrt(dx * dx + dy * dy)
+        # unit vector along collision line (coincident centres are skipped)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            nx = dx / dist
+            ny = dy / dist
+        # component of relative speed along collision line
+        dvn = (vx[a] - vx[b]) * nx + (vy[a] - vy[b]) * ny
+        hit = (dist < 2 * radius) & (dvn > 0)  # only approaching particles
+        a, b, nx, ny, dvn, dist = a[hit], b[hit], nx[hit], ny[hit], dvn[hit], dist[hit]
+
+        # for equal masses: v1' = v1 - dvn*n, v2' = v2 + dvn*n
+        vx[a] -= dvn * nx
+        vy[a] -= dvn * ny
+        vx[b] += dvn * nx
+        vy[b] += dvn * ny
+
+        # separating particles, so they wouldn't glue together
+        sep = (2 * radius - dist) / 2.0
+        x[a] -= sep * nx
+        y[a] -= sep * ny
+        x[b] += sep * nx
+        y[b] += sep * ny
+        hit_i.append(a)
+        hit_j.append(b)
+    if not hit_i:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    return np.concatenate(hit_i), np.concatenate(hit_j)
+
+
+def resolve_pairs_coloured(x, y, vx, vy, i, j, home, colour, radius, pool, chunks,
+                           resolve=resolve_pairs, box=None):
+    """resolve_pairs spread over a thread pool.
+
+    home[k] is the cell the stencil of pair k starts from and colour[k] its
+    colour. Stencils of one colour never share a cell, so each colour is cut
+    at home cell borders into chunks that threads resolve at the same time
+    without locks. Colours run one after another, which fixes the result no
+    matter how the threads are scheduled. The NumPy kernels drop the GIL for
+    large arrays, on free-threaded builds the chunks run fully in parallel.
+    """
+    by_colour = np.argsort(colour, kind="stable")
+    i, j, home, colour = i[by_colour], j[by_colour], home[by_colour], colour[by_colour]
+    bounds = np.flatnonzero(np.diff(colour)) + 1
+    hit_i, hit_j = [], []
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(colour)]):
+        # chunk edges only where the home cell changes
+        edges = np.flatnonzero(np.diff(home[lo:hi])) + lo + 1
+        targets = np.linspace(lo, hi, chunks + 1)[1:-1]
+        cuts = np.unique(edges[np.minimum(np.searchsorted(edges, targets), len(edges) - 1)]
+                         if len(edges) else [])
+        cuts = np.r_[lo, cuts, hi].astype(np.intp)
+        futures = [pool.submit(resolve, x, y, vx, vy, i[a:b], j[a:b], radius, box)
+                   for a, b in zip(cuts[:-1], cuts[1:])]
+        for future in futures:
+            a, b = future.result()
+            hit_i.append(a)
+            hit_j.append(b)
+    if not hit_i:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    return np.concatenate(hit_i), np.concatenate(hit_j)
+
+
+class ParticleView:
+    """Particle-like handle onto one row of a ParticleSystem."""
+
+    __slots__ = ("system", "index")
+
+    def __init__(self, system, index):
+        self.system = system
+        self.index = index
+
+    @property
+    def x(self):
+        return float(self.system.x[self.index])
+
+    @x.setter
+    def x(self, value):
+        self.system.x[self.index] = value
+
+    @property
+    def y(self):
+        return float(self.system.y[self.index])
+
+    @y.setter
+    def y(self, value):
+        self.system.y[self.index] = value
+
+    @property
+    def vx(self):
+        return float(self.system.vx[self.index])
+
+    @vx.setter
+    def vx(self, value):
+        self.system.vx[self.index] = value
+
+    @property
+    def vy(self):
+        return float(self.system.vy[self.index])
+
+    @vy.setter
+    def vy(self, value):
+        self.system.vy[self.index] = value
+
+    def update_position(self, dt=DT):  # changing position s=vt
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+
+    def check_walls(self):  # bouncing off the walls
+        r, width, height = self.system.radius, self.system.width, self.system.height
+        if self.x - r < 0 or self.x + r > width:
+            self.vx = -self.vx
+            self.x = max(r, min(self.x, width - r))
+        if self.y - r < 0 or self.y + r > height:
+            self.vy = -self.vy
+            self.y = max(r, min(self.y, height - r))
+
+    def collide_with(self, other):  # collisions between particles
+        r = self.system.radius
+        dx = other.x - self.x
+        dy = other.y - self.y
+        dist2 = dx * dx + dy * dy  # optimisation, sqrt is demanding
+        if dist2 >= 4 * r * r:
+            return  # lack of collision
+
+        dist = math.sqrt(dist2)
+
+        # unit vector along collision line
+        nx = dx / dist
+        ny = dy / dist
+
+        # relative speed
+        dvx = self.vx - other.vx
+        dvy = self.vy - other.vy
+
+        # component of relative speed along collision line
+        dvn = dvx * nx + dvy * ny
+        if dvn <= 0:  # particles are getting further from each other
+            return
+
+        # for equal masses: changing component along nx, ny
+        # (it can be written as v1' = v1 - dvn*n, v2' = v2 + dvn*n)
+        impulse = dvn  # 2 * dvn / (m1+m2)  → when m1=m2 = 1
+        self.vx -= impulse * nx
+        self.vy -= impulse * ny
+        other.vx += impulse * nx
+        other.vy += impulse * ny
+
+        # ----- separating particles, so they wouldn't glue together -----
+        sep = (2 * r - dist) / 2.0
+        self.x -= sep * nx
+        self.y -= sep * ny
+        other.x += sep * nx
+        other.y += sep * ny
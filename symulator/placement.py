@@ -0,0 +1,199 @@
+import math
+
+import numpy as np
+
+# cells of the sampling grid that can hold a sample closer than d to a
+# candidate (5 x 5 without the corners), nearest first since those reject
+# most candidates; the grid is padded by two cells on every side so the
+# lookups need no bounds checks
+_OFFSETS = sorted(((ox, oy) for ox in range(-2, 3) for oy in range(-2, 3)
+                   if 0 < ox * ox + oy * oy < 8), key=lambda o: o[0] * o[0] + o[1] * o[1])
+# candidates of one phase (gx % 3, gy % 3) are at least two cells apart
+_PHASES = 3
+# candidates per active sample and round
+_BATCH = 4
+# below this many particles per d^2 of box, darts replace the full fill
+# (a full Bridson fill reaches about 0.63)
+_DART_FILL = 0.25
+_DART_ROUNDS = 20
+
+
+def uniform(num_particles, width, height, radius, rng):
+    # the original placement: independent uniform positions, overlaps allowed
+    x = rng.uniform(radius, width - radius, num_particles)
+    y = rng.uniform(radius, height - radius, num_particles)
+    return x, y
+
+
+def poisson_disc(num_particles, width, height, radius, rng, tries=30):
+    """Non-overlapping positions from Bridson's Poisson-disc sampling.
+
+    A dilute gas only throws uniform darts for the particles still missing,
+    so its cost grows with num_particles. Denser systems fill the whole box
+    and keep num_particles of the samples at random. Cells of the background
+    grid are d / sqrt(2) wide (d = 2 * radius), so a cell holds at most one
+    sample and a candidate is checked against the 5 x 5 cells around it.
+    Unlike the original one point at a time, every active sample throws a
+    few candidates in the annulus d..2d per round, all at once; candidates
+    are then accepted in nine phases of cells (gx % 3, gy % 3), and two
+    cells of one phase are too far apart for their candidates to overlap,
+    so each phase is a single vectorized check. As in the original a sample
+    retires after tries candidates in a row were rejected. The fill starts
+    from seeds spread over the box, which keeps the number of rounds low.
+    Raises ValueError when fewer than num_particles disks fit, denser
+    systems need a lattice.
+    """
+    d = 2 * radius
+    w, h = width - d, height - d  # the range of the centres
+    if w < 0 or h < 0:
+        raise ValueError("the box is smaller than a particle")
+    cs = d / math.sqrt(2)
+    gw, gh = max(1, math.ceil(w / cs)), max(1, math.ceil(h / cs))
+    stride = gh + 4
+    # position of the sample in every cell, NaN for empty cells never
+    # compares as closer than d
+    grid_x = np.full((gw + 4) * stride, np.nan)
+    grid_y = np.full((gw + 4) * stride, np.nan)
+    claim = np.empty(len(grid_x), dtype=np.intp)  # scratch for one candidate per cell
+    px = np.zeros(gw * gh + 1)
+    py = np.zeros(gw * gh + 1)
+    count = 0
+
+    def accept(cx, cy, source):
+        # adds the candidates that keep the distance d, returns the sources
+        # of the accepted ones
+        nonlocal count
+        inside = np.flatnonzero((cx >= 0) & (cx <= w) & (cy >= 0) & (cy <= h))
+        cx, cy, source = cx[inside], cy[inside], source[inside]
+        gx = np.minimum((cx // cs).astype(np.intp), gw - 1)
+        gy = np.minimum((cy // cs).astype(np.intp), gh - 1)
+        cell = (gx + 2) * stride + gy + 2
+        keep = _free(grid_x, grid_y, cx, cy, cell, stride, d)
+        # one candidate per cell, the candidates come in random order
+        claim[cell[keep]] = keep
+        keep = keep[claim[cell[keep]] == keep]
+        cx, cy, gx, gy, cell, source = (
+            cx[keep], cy[keep], gx[keep], gy[keep], cell[keep], source[keep])
+        phase = gx % _PHASES * _PHASES + gy % _PHASES
+        accepted = []
+        for k in range(_PHASES * _PHASES):
+            sel = np.flatnonzero(phase == k)
+            # again, against the samples accepted by the earlier phases
+            sel = sel[_free(grid_x, grid_y, cx[sel], cy[sel], cell[sel], stride, d)]
+            index = np.arange(count, count + len(sel))
+            px[index], py[index] = cx[sel], cy[sel]
+            grid_x[cell[sel]], grid_y[cell[sel]] = cx[sel], cy[sel]
+            count += len(sel)
+            accepted.append(source[sel])
+        return np.concatenate(accepted)
+
+    if num_particles <= _DART_FILL * w * h / (d * d):
+        # dilute gas: throw darts for the missing particles only, the box is
+        # far from full, so a few rounds place all of them
+        for _ in range(_DART_ROUNDS):
+            missing = num_particles - count
+            if not missing:
+                return px[:count] + radius, py[:count] + radius
+            accept(rng.uniform(0, w, missing), rng.uniform(0, h, missing),
+                   np.full(missing, -1))
+        # unlucky darts, the fill below grows from the ones that landed
+    else:
+        seeds = max(1, gw * gh // 256)
+        accept(rng.uniform(0, w, seeds), rng.uniform(0, h, seeds), np.full(seeds, -1))
+    active = np.arange(count)
+    failed = np.zeros(len(px), dtype=np.intp)  # tries without an accepted candidate
+    while len(active):
+        before = count
+        source = np.repeat(active, _BATCH)
+        # uniform over the area of the annulus
+        rho, theta = rng.random((2, len(source)))
+        rho = d * np.sqrt(1 + 3 * rho)
+        theta *= 2 * math.pi
+        cx = px[source] + rho * np.cos(theta)
+        cy = py[source] + rho * np.sin(theta)
+        productive = np.isin(active, accept(cx, cy, source))
+        failed[active] = np.where(productive, 0, failed[active] + _BATCH)
+        active = np.concatenate((active[failed[active] < tries], np.arange(before, count)))
+
+    if count < num_particles:
+        raise ValueError(f"only {count} particles of radius {radius} fit with Poisson-disc "
+                         f"sampling, use the square or hex lattice")
+    keep = np.sort(rng.choice(count, num_particles, replace=False))
+    return px[keep] + radius, py[keep] + radius
+
+
+def _free(grid_x, grid_y, cx, cy, cell, stride, d):
+    # positions of the candidates with no sample closer than d; the own
+    # cell goes first, it rejects most candidates once the box fills up
+    alive = np.flatnonzero(np.isnan(grid_x[cell]))
+    for ox, oy in _OFFSETS:
+        near = cell[alive] + (ox * stride + oy)
+        dx = grid_x[near] - cx[alive]
+        dy = grid_y[near] - cy[alive]
+        alive = alive[~(dx * dx + dy * dy < d * d)]
+    return alive
+
+
+def square_lattice(num_particles, width, height, radius, rng):
+    return _lattice(num_particles, width, height, radius, rng, hexagonal=False)
+
+
+def hex_lattice(num_particles, width, height, radius, rng):
+    return _lattice(num_particles, width, height, radius, rng, hexagonal=True)
+
+
+def _lattice(num_particles, width, height, radius, rng, hexagonal):
+    """Sites of the widest square or hexagonal lattice with num_particles sites.
+
+    Every column count is tried at once and the one giving the largest
+    spacing wins, the lattice is centred in the box. Surplus sites of the
+    last row are left empty at random places. The hexagonal lattice reaches
+    a packing fraction of 0.907, the square one 0.785.
+    """
+    d = 2 * radius
+    w, h = width - d, height - d  # the range of the centres
+    if num_particles == 0:
+        return np.empty(0), np.empty(0)
+    cols = np.arange(1, num_particles + 1)
+    rows = -(-num_particles // cols)
+    row_step = math.sqrt(3) / 2 if hexagonal else 1.0
+    # lattice extent in units of the spacing, odd rows of the hexagonal
+    # lattice are shifted by half a spacing
+    span_x = cols - 1 + np.where(hexagonal & (rows > 1), 0.5, 0.0)
+    span_y = (rows - 1) * row_step
+    with np.errstate(divide="ignore"):
+        spacing = np.minimum(np.where(span_x > 0, w / span_x, np.inf),
+                             np.where(span_y > 0, h / span_y, np.inf))
+    best = int(np.argmax(spacing))
+    a, c, r = spacing[best], int(cols[best]), int(rows[best])
+    if a < d:
+        kind = "hex" if hexagonal else "square"
+        raise ValueError(f"{num_particles} particles of radius {radius} do not fit "
+                         f"on a {kind} lattice in a {width} x {height} box")
+    a = min(a, max(w, h, d))  # a single site or row has no spacing to fill
+    site = np.sort(rng.choice(c * r, num_particles, replace=False))
+    i, j = site % c, site // c
+    x = (i + 0.5 * (hexagonal & (j % 2 == 1))) * a
+    y = j * row_step * a
+    # centred, clipped against rounding at the far edges
+    x = np.clip(x + (w - float(span_x[best]) * a) / 2, 0, w) + radius
+    y = np.clip(y + (h - float(span_y[best]) * a) / 2, 0, h) + radius
+    return x, y
+
+
+def poisson_or_hex(num_particles, width, height, radius, rng):
+    # Poisson-disc sampling, the hex lattice when the gas is too dense for
+    # it: such a run starts from a crystal that melts in the first steps
+    try:
+        return poisson_disc(num_particles, width, height, radius, rng)
+    except ValueError:
+        return hex_lattice(num_particles, width, height, radius, rng)
+
+
+PLACEMENTS = {
+    "auto": poisson_or_hex,
+    "random": uniform,
+    "poisson": poisson_disc,
+    "square": square_lattice,
+    "hex": hex_lattice,
+}
@@ -0,0 +1,90 @@
+import csv
+import json
+from time import perf_counter_ns
+
+# engine phases, then the ones the viewer adds after a step
+PHASES = ("integrate", "walls", "grid", "collisions", "draw", "energy")
+FIELDS = (("step",) + tuple(f"{phase}_ns" for phase in PHASES)
+          + ("pairs_tested", "collisions", "occupied_cells", "mean_per_cell", "max_per_cell"))
+
+
+class StepProfiler:
+    """Wall time of every phase of every step, measured with perf_counter_ns.
+
+    Simulation.step calls begin(), mark(phase) after each phase and
+    end_step(sim), which adds the candidate pairs, the collisions and how
+    full the cells are. The row of a step stays open until the next step
+    begins, so the viewer can mark("draw") and mark("energy") into it (call
+    resume() first, the time since the end of the step is not counted).
+
+    With a stream every finished row is written as CSV (header first) or as
+    one JSON object per line; last holds the latest finished row.
+    """
+
+    def __init__(self, stream=None, fmt="csv"):
+        if fmt not in ("csv", "json"):
+            raise ValueError(f"unknown format {fmt!r}, use csv or json")
+        self.stream = stream
+        self.fmt = fmt
+        self._writer = None
+        self.row = None
+        self.last = None
+        self.rows = 0
+        self._clock = 0
+
+    def begin(self):
+        self.flush()
+        self.row = dict.fromkeys(FIELDS, 0)
+        self._clock = perf_counter_ns()
+
+    def resume(self):
+        self._clock = perf_counter_ns()
+
+    def mark(self, phase):
+        # time since the previous mark (or begin / resume) goes to phase
+        now = perf_counter_ns()
+        if self.row is not None:
+            self.row[f"{phase}_ns"] += now - self._clock
+        self._clock = now
+
+    def end_step(self, sim):
+        row = self.row
+        row["step"] = sim.step_count
+        row["pairs_tested"] = sim.pairs_tested
+        row["collisions"] = sim.collisions
+        grid = sim.neighbours.grid if sim.neighbours is not None else sim.grid
+        if grid.start is not None:
+            counts = grid.counts()
+            occupied = int((counts > 0).sum())
+            row["occupied_cells"] = occupied
+            row["mean_per_cell"] = float(counts.sum()) / max(1, occupied)
+            row["max_per_cell"] = int(counts.max(initial=0))
+
+    def flush(self):
+        if self.row is None:
+            return
+        row, self.row = self.row, None
+        self.last = row
+        self.rows += 1
+        if self.stream is None:
+            return
+        if self.fmt == "json":
+            self.stream.write(json.dumps(row) + "\n")
+        else:
+            if self._writer is None:
+                self._writer = csv.DictWriter(self.stream, fieldnames=FIELDS)
+                self._writer.writeheader()
+            self._writer.writerow(row)
+
+    def summary(self):
+        # lines for the on-screen HUD, from the last finished step
+        row = self.last
+        if row is None:
+            return []
+        times = "  ".join(f"{phase} {row[f'{phase}_ns'] / 1e6:.2f}" for phase in PHASES)
+        return [
+            f"ms: {times}",
+            f"pary: {row['pairs_tested']}  zderzenia: {row['collisions']}",
+            f"komórki: {row['occupied_cells']} zajęte, "
+            f"średnio {row['mean_per_cell']:.1f}, max {row['max_per_cell']}",
+        ]
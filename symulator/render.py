@@ -0,0 +1,133 @@
+# Drawing helpers for the pygame viewer, the headless engine never imports this
+import numpy as np
+import pygame
+
+from .broadphase import CellGrid
+from .config import WIDTH, HEIGHT, CELL_SIZE, PARTICLE_RADIUS, HEATMAP_THRESHOLD
+
+COLOR_KEY = (0, 255, 0)  # never produced by the blue -> red ramp
+
+
+def speed_colour_values(speeds):
+    # Color dependent on the speed (blue -> red): red = min(255, 40 * speed)
+    return np.minimum(255, (40 * speeds).astype(np.intp))
+
+
+def make_renderer(num_particles, threshold=HEATMAP_THRESHOLD, radius=PARTICLE_RADIUS,
+                  width=WIDTH, height=HEIGHT, mode="density"):
+    # circles while they are still worth looking at, a heatmap above that
+    if num_particles > threshold:
+        return HeatmapRenderer(width, height, mode=mode)
+    return SpriteRenderer(radius)
+
+
+class SpriteRenderer:
+    """Draws all particles with one Surface.blits call.
+
+    A circle sprite is pre-rendered for every value of the colour ramp, so a
+    frame only has to pick a sprite per particle (vectorized) and hand the
+    whole list to pygame instead of calling pygame.draw.circle per particle.
+    """
+
+    def __init__(self, radius=PARTICLE_RADIUS, buckets=256):
+        self.radius = radius
+        self.buckets = buckets
+        size = 2 * int(np.ceil(radius)) + 1
+        self.sprites = []
+        for b in range(buckets):
+            color_val = round(b * 255 / max(1, buckets - 1))
+            sprite = pygame.Surface((size, size))
+            sprite.fill(COLOR_KEY)
+            pygame.draw.circle(sprite, (color_val, 0, 255 - color_val), (size // 2, size // 2), radius)
+            sprite.set_colorkey(COLOR_KEY, pygame.RLEACCEL)
+            self.sprites.append(sprite)
+        self.offset = size // 2
+
+    def convert(self):
+        # after pygame.display.set_mode: match the screen format for fast blits
+        self.sprites = [sprite.convert() for sprite in self.sprites]
+        return self
+
+    def bucket_of(self, speeds):
+        return speed_colour_values(speeds) * (self.buckets - 1) // 255
+
+    def draw(self, screen, x, y, speeds):
+        sprites = self.sprites
+        xs = (x.astype(np.intp) - self.offset).tolist()
+        ys = (y.astype(np.intp) - self.offset).tolist()
+        buckets = self.bucket_of(speeds).tolist()
+        screen.blits([(sprites[b], (px, py)) for b, px, py in zip(buckets, xs, ys)], doreturn=False)
+
+
+class HeatmapRenderer:
+    """Level of detail for huge systems: one coloured block per grid cell.
+
+    Particles are binned with np.bincount into the collision grid (cell_size=1
+    gives a pixel histogram) and the cells are coloured along the same blue ->
+    red ramp, either by particle count ("density", scaled to the fullest cell)
+    or by the mean speed in the cell ("speed"). Empty cells stay white. The
+    image goes to the screen through pygame.surfarray, so the cost does not
+    depend on how many particles there are beyond the binning.
+    """
+
+    MODES = ("density", "speed")
+
+    def __init__(self, width=WIDTH, height=HEIGHT, cell_size=CELL_SIZE, mode="density"):
+        if mode not in self.MODES:
+            raise ValueError(f"unknown heatmap mode {mode!r}, choose from {self.MODES}")
+        self.mode = mode
+        self.grid = CellGrid(width, height, cell_size)
+        # square blocks, the last row and column may stick out of the window
+        self.size = (self.grid.grid_w * cell_size, self.grid.grid_h * cell_size)
+
+    def convert(self):
+        return self  # nothing pre-rendered
+
+    def toggle(self):
+        self.mode = self.MODES[1 - self.MODES.index(self.mode)]
+
+    def colour_values(self, x, y, speeds):
+        # 0..255 along the ramp per cell, -1 for empty cells
+        grid = self.grid
+        cell = grid.cell_ids(x, y)
+        counts = np.bincount(cell, minlength=grid.num_cells)
+        if self.mode == "density":
+            values = counts * 255 // max(1, counts.max())
+        else:
+            total = np.bincount(cell, weights=speeds, minlength=grid.num_cells)
+            values = speed_colour_values(total / np.maximum(counts, 1))
+        values[counts == 0] = -1
+        return values.reshape(grid.grid_w, grid.grid_h)  # id = gx * grid_h + gy
+
+    def image(self, x, y, speeds):
+        values = self.colour_values(x, y, speeds)
+        rgb = np.full(values.shape + (3,), 255, dtype=np.uint8)
+        filled = values >= 0
+        rgb[filled, 0] = values[filled]
+        rgb[filled, 1] = 0
+        rgb[filled, 2] = 255 - values[filled]
+        return rgb  # surfarray layout: [x, y, channel]
+
+    def draw(self, screen, x, y, speeds):
+        surface = pygame.surfarray.make_surface(self.image(x, y, speeds))
+        screen.blit(pygame.transform.scale(surface, self.size), (0, 0))
+
+
+def draw_speed_histogram(screen, histogram, rect, accumulated=False):
+    """Measured speed histogram as bars, Maxwell-Boltzmann as a line."""
+    rect = pygame.Rect(rect)
+    measured = histogram.density(accumulated)
+    expected = histogram.expected()
+    scale = rect.height / max(measured.max(), expected.max(), 1e-12)
+    panel = pygame.Surface(rect.size, pygame.SRCALPHA)
+    panel.fill((255, 255, 255, 200))
+    bar_width = rect.width / histogram.bins
+    lefts = (np.arange(histogram.bins) * bar_width).astype(int).tolist()
+    rights = (np.arange(1, histogram.bins + 1) * bar_width).astype(int).tolist()
+    heights = (measured * scale).astype(int).tolist()
+    for left, right, height in zip(lefts, rights, heights):
+        panel.fill((120, 120, 220), (left, rect.height - height, max(1, right - left - 1), height))
+    centres = ((np.arange(histogram.bins) + 0.5) * bar_width).tolist()
+    curve = (rect.height - expected * scale).tolist()
+    pygame.draw.lines(panel, (220, 0, 0), False, list(zip(centres, curve)), 2)
+    screen.blit(panel, rect.topleft)
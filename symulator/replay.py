@@ -0,0 +1,64 @@
+import numpy as np
+
+SPEEDS = (0.125, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)  # frames per displayed frame
+
+
+class ReplayCursor:
+    """Play position in a recorded Trajectory, the viewer only asks for frame().
+
+    advance() moves by speed frames per displayed frame unless paused and
+    stops at the last frame. Only the frame that is displayed is read from
+    the file, skipped frames are never touched.
+    """
+
+    def __init__(self, trajectory):
+        self.trajectory = trajectory
+        self.position = 0.0
+        self.speed_index = SPEEDS.index(1)
+        self.paused = False
+
+    @property
+    def speed(self):
+        return SPEEDS[self.speed_index]
+
+    @property
+    def index(self):
+        return int(self.position)
+
+    def last(self):
+        return max(0, len(self.trajectory) - 1)
+
+    def advance(self):
+        if not self.paused:
+            self.seek(self.position + self.speed)
+            if self.index == self.last():
+                self.paused = True
+        return self.index
+
+    def seek(self, position):
+        self.position = float(min(max(position, 0), self.last()))
+
+    def seek_fraction(self, fraction):
+        self.seek(fraction * self.last())
+
+    def faster(self):
+        self.speed_index = min(self.speed_index + 1, len(SPEEDS) - 1)
+
+    def slower(self):
+        self.speed_index = max(self.speed_index - 1, 0)
+
+    def toggle_pause(self):
+        if self.paused and self.index == self.last():
+            self.position = 0.0  # replay from the start
+        self.paused = not self.paused
+
+    def frame(self):
+        # x, y and the speeds of the displayed frame
+        x, y, vx, vy = self.trajectory[self.index]
+        return x, y, np.hypot(vx, vy)
+
+    def energy(self):
+        _, _, vx, vy = self.trajectory[self.index]
+        vx = vx.astype(np.float64)
+        vy = vy.astype(np.float64)
+        return 0.5 * float(np.dot(vx, vx) + np.dot(vy, vy))
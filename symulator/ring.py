@@ -0,0 +1,161 @@
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .engine import Simulation
+
+FIELDS = ("x", "y", "speeds")
+
+
+class FrameRing:
+    """Ring of frames (x, y, speed as float32) in one shared memory block.
+
+    The writer fills the slots round-robin and never waits for readers. Each
+    slot has a sequence number that is odd while the slot is being written,
+    so a reader can tell a finished frame from a half written one: latest()
+    returns views straight into the newest finished slot, and frame.intact()
+    says afterwards whether the writer came around to that slot again in the
+    meantime (only possible when it writes slots - 1 frames during one read).
+    """
+
+    def __init__(self, num_particles, slots=4, name=None):
+        if slots < 2:
+            raise ValueError("a ring needs at least two slots")
+        self.num_particles = num_particles
+        self.slots = slots
+        sizes = [8 * (1 + slots), 8 * slots * 3, 8, 4 * slots * len(FIELDS) * num_particles]
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=sum(sizes))
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        offsets = np.cumsum([0] + sizes)
+        buf = self.shm.buf
+        # frames written so far, then one sequence number per slot
+        self.counters = np.ndarray((1 + slots,), np.int64, buf, offsets[0])
+        self.meta = np.ndarray((slots, 3), np.float64, buf, offsets[1])  # step, time, energy
+        self.info = np.ndarray((1,), np.float64, buf, offsets[2])  # initial energy
+        self.data = np.ndarray((slots, len(FIELDS), num_particles), np.float32, buf, offsets[3])
+        if self.owner:
+            self.counters[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def frames_written(self):
+        return int(self.counters[0])
+
+    def write(self, sim):
+        frame = self.frames_written
+        slot = frame % self.slots
+        seq = self.counters[1:]
+        seq[slot] = 2 * frame + 1  # odd: being written
+        p = sim.particles
+        out = self.data[slot]
+        out[0] = p.x
+        out[1] = p.y
+        np.hypot(p.vx, p.vy, out=out[2], dtype=np.float32, casting="same_kind")
+        self.meta[slot] = sim.step_count, sim.time, sim.kinetic_energy()
+        seq[slot] = 2 * frame + 2  # even: finished
+        self.counters[0] = frame + 1
+
+    def latest(self):
+        # newest finished frame or None before the first one
+        frame = self.frames_written - 1
+        if frame < 0:
+            return None
+        slot = frame % self.slots
+        seq = int(self.counters[1 + slot])
+        if seq != 2 * frame + 2:
+            return None  # overtaken while we looked, try again next time
+        return Frame(self, slot, seq)
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class Frame:
+    """Read-only views into one slot of a FrameRing."""
+
+    def __init__(self, ring, slot, seq):
+        self.ring = ring
+        self.slot = slot
+        self.seq = seq
+        self.x, self.y, self.speeds = ring.data[slot]
+        step, self.time, self.energy = ring.meta[slot].tolist()
+        self.step = int(step)
+
+    def intact(self):
+        return int(self.ring.counters[1 + self.slot]) == self.seq
+
+
+class PhysicsProcess:
+    """Simulation running in its own process, publishing into a FrameRing.
+
+    The viewer process only reads the ring, so drawing and stepping never
+    compete for one GIL. steps_per_frame can be changed while running.
+    """
+
+    def __init__(self, num_particles, max_speed, rate=None, steps_per_frame=1, slots=4,
+                 **kwargs):
+        self.ring = FrameRing(num_particles, slots)
+        ctx = mp.get_context()
+        self._halt = ctx.Event()
+        self._steps = ctx.Value("i", steps_per_frame, lock=False)
+        self.process = ctx.Process(
+            target=_run, daemon=True,
+            args=(self.ring.name, num_particles, slots, max_speed, kwargs, rate,
+                  self._steps, self._halt))
+        self.process.start()
+
+    @property
+    def steps_per_frame(self):
+        return self._steps.value
+
+    @steps_per_frame.setter
+    def steps_per_frame(self, value):
+        self._steps.value = max(1, int(value))
+
+    @property
+    def initial_energy(self):
+        return float(self.ring.info[0])
+
+    def latest(self):
+        return self.ring.latest()
+
+    def stop(self):
+        self._halt.set()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.ring.close()
+        if self.process.exitcode:
+            raise RuntimeError(f"physics process exited with code {self.process.exitcode}")
+
+
+def _run(name, num_particles, slots, max_speed, kwargs, rate, steps, halt):
+    ring = FrameRing(num_particles, slots, name=name)
+    try:
+        with Simulation(num_particles, max_speed, **kwargs) as sim:
+            ring.info[0] = sim.initial_energy
+            ring.write(sim)
+            deadline = time.perf_counter()
+            while not halt.is_set():
+                sim.step(steps.value)
+                ring.write(sim)
+                if rate:
+                    deadline += 1 / rate
+                    delay = deadline - time.perf_counter()
+                    if delay > 0:
+                        halt.wait(delay)
+                    else:
+                        deadline = time.perf_counter()
+    finally:
+        ring.close()
@@ -0,0 +1,87 @@
+import contextlib
+import threading
+import time
+
+import numpy as np
+
+
+class Snapshot:
+    """Positions and speeds of all particles after one batch of steps."""
+
+    def __init__(self, num_particles, dtype):
+        self.x = np.empty(num_particles, dtype=dtype)
+        self.y = np.empty(num_particles, dtype=dtype)
+        self.speeds = np.empty(num_particles, dtype=dtype)
+        self.step = 0
+        self.time = 0.0
+        self.energy = 0.0
+
+    def fill(self, sim):
+        p = sim.particles
+        self.x[:] = p.x
+        self.y[:] = p.y
+        np.hypot(p.vx, p.vy, out=self.speeds)
+        self.step = sim.step_count
+        self.time = sim.time
+        self.energy = sim.kinetic_energy()
+
+
+class PhysicsThread(threading.Thread):
+    """Steps a simulation in the background while the viewer draws.
+
+    Every batch of steps_per_frame steps is copied into the back one of two
+    snapshots, which then becomes the front one; latest() hands out the
+    front snapshot. The copy never waits for the viewer, only the swap does,
+    and only while a frame is being drawn from the front snapshot.
+
+    rate is the number of batches per second, None runs as fast as possible.
+    Raising steps_per_frame while running fast-forwards: the same number of
+    frames shows more physics.
+    """
+
+    def __init__(self, sim, rate=None, steps_per_frame=1):
+        super().__init__(name="physics", daemon=True)
+        if steps_per_frame < 1:
+            raise ValueError("steps_per_frame must be at least 1")
+        self.sim = sim
+        self.rate = rate
+        self.steps_per_frame = steps_per_frame
+        self.error = None
+        dtype = sim.particles.dtype
+        self._front = Snapshot(len(sim), dtype)
+        self._back = Snapshot(len(sim), dtype)
+        self._front.fill(sim)
+        self._swap = threading.Lock()
+        self._halt = threading.Event()
+
+    def run(self):
+        deadline = time.perf_counter()
+        try:
+            while not self._halt.is_set():
+                self.sim.step(self.steps_per_frame)
+                self._back.fill(self.sim)
+                with self._swap:
+                    self._front, self._back = self._back, self._front
+                if self.rate:
+                    deadline += 1 / self.rate
+                    delay = deadline - time.perf_counter()
+                    if delay > 0:
+                        self._halt.wait(delay)
+                    else:
+                        deadline = time.perf_counter()  # behind, do not catch up in a burst
+        except Exception as exc:
+            self.error = exc
+
+    @contextlib.contextmanager
+    def latest(self):
+        # the swap waits until the with block ends, so the snapshot stays whole
+        with self._swap:
+            yield self._front
+
+    def stop(self):
+        self._halt.set()
+        if self.is_alive():
+            self.join()
+        if self.error is not None:
+            raise RuntimeError("physics thread failed") from self.error
+
@@ -0,0 +1,150 @@
+import queue
+import threading
+
+import numpy as np
+
+MAGIC = b"SYMTRAJ1"
+HEADER = np.dtype([
+    ("magic", "S8"),
+    ("num_particles", "<i8"),
+    ("capacity", "<i8"),
+    ("frames", "<i8"),  # frames written so far
+    ("stride", "<i8"),  # steps between frames
+    ("dt", "<f8"),
+    ("width", "<f8"),
+    ("height", "<f8"),
+    ("radius", "<f8"),
+])
+HEADER_SIZE = 128
+FIELDS = ("x", "y", "vx", "vy")
+
+
+def _layout(capacity, num_particles):
+    # header, step number of every frame, then the float32 frames
+    steps_offset = HEADER_SIZE
+    frames_offset = steps_offset + 8 * capacity
+    size = frames_offset + 4 * len(FIELDS) * num_particles * capacity
+    return steps_offset, frames_offset, size
+
+
+class TrajectoryWriter:
+    """Appends frames (x, y, vx, vy as float32) to a pre-allocated file.
+
+    The file holds a small header, the step number of every frame and room
+    for capacity frames, all memory mapped. record() only copies the arrays
+    into one of a few spare buffers; a background thread moves them into the
+    map, so stepping waits only when all buffers are still queued.
+    """
+
+    def __init__(self, path, sim, capacity, stride=1, buffers=4):
+        if capacity < 1:
+            raise ValueError("capacity must be at least one frame")
+        n = len(sim)
+        steps_offset, frames_offset, size = _layout(capacity, n)
+        with open(path, "wb") as f:
+            f.truncate(size)
+        self.header = np.memmap(path, HEADER, "r+", 0, shape=())
+        self.header["magic"] = MAGIC
+        self.header["num_particles"] = n
+        self.header["capacity"] = capacity
+        self.header["frames"] = 0
+        self.header["stride"] = stride
+        self.header["dt"] = sim.dt
+        self.header["width"] = sim.width
+        self.header["height"] = sim.height
+        self.header["radius"] = sim.radius
+        self.steps = np.memmap(path, np.int64, "r+", steps_offset, shape=(capacity,))
+        self.frames = np.memmap(path, np.float32, "r+", frames_offset,
+                                shape=(capacity, len(FIELDS), n))
+        self.capacity = capacity
+        self.count = 0  # frames handed to record()
+        self.error = None
+        self._free = queue.Queue()
+        for _ in range(buffers):
+            self._free.put(np.empty((len(FIELDS), n), dtype=np.float32))
+        self._pending = queue.Queue()
+        self._thread = threading.Thread(target=self._write, name="trajectory", daemon=True)
+        self._thread.start()
+
+    def record(self, sim):
+        if self.error is not None:
+            raise RuntimeError("trajectory writer failed") from self.error
+        if self.count >= self.capacity:
+            raise RuntimeError(f"trajectory is full ({self.capacity} frames)")
+        buffer = self._free.get()
+        p = sim.particles
+        for row, name in enumerate(FIELDS):
+            buffer[row] = getattr(p, name)
+        self._pending.put((self.count, sim.step_count, buffer))
+        self.count += 1
+
+    def _write(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            k, step, buffer = item
+            try:
+                self.frames[k] = buffer
+                self.steps[k] = step
+                self.header["frames"] = k + 1
+            except Exception as exc:
+                self.error = exc
+            self._free.put(buffer)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._pending.put(None)
+            self._thread.join()
+        self.frames.flush()
+        self.steps.flush()
+        self.header.flush()
+        if self.error is not None:
+            raise RuntimeError("trajectory writer failed") from self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Trajectory:
+    """Lazy reader: frames are read from disk only when they are touched."""
+
+    def __init__(self, path):
+        header = np.memmap(path, HEADER, "r", 0, shape=())
+        if header["magic"] != MAGIC:
+            raise ValueError(f"{path} is not a trajectory file")
+        self.num_particles = int(header["num_particles"])
+        self.capacity = int(header["capacity"])
+        self.stride = int(header["stride"])
+        self.dt = float(header["dt"])
+        self.width = float(header["width"])
+        self.height = float(header["height"])
+        self.radius = float(header["radius"])
+        self._header = header
+        steps_offset, frames_offset, _ = _layout(self.capacity, self.num_particles)
+        self.steps = np.memmap(path, np.int64, "r", steps_offset, shape=(self.capacity,))
+        self.frames = np.memmap(path, np.float32, "r", frames_offset,
+                                shape=(self.capacity, len(FIELDS), self.num_particles))
+
+    def __len__(self):
+        # re-read, a trajectory can be opened while it is still being written
+        return int(self._header["frames"])
+
+    def __getitem__(self, k):
+        # x, y, vx, vy of frame k as views into the file
+        n = len(self)
+        if k < 0:
+            k += n
+        if not 0 <= k < n:
+            raise IndexError("frame index out of range")
+        return tuple(self.frames[k])
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def step_of(self, k):
+        return int(self.steps[k])
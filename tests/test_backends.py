@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from symulator import backends
+from symulator.engine import Simulation
+
+
+@pytest.mark.parametrize("periodic", [False, True])
+def test_numba_matches_numpy(periodic):
+    pytest.importorskip("numba")
+    runs = {}
+    for name in ("numpy", "numba"):
+        sim = Simulation(5000, 10, width=1200, height=900, backend=name, periodic=periodic,
+                         rng=np.random.default_rng(7))
+        runs[name] = sim.step(10)
+    np.testing.assert_allclose(runs["numba"].positions, runs["numpy"].positions, atol=1e-9)
+    np.testing.assert_allclose(runs["numba"].velocities, runs["numpy"].velocities, atol=1e-9)
+    assert runs["numba"].collisions == runs["numpy"].collisions
+    np.testing.assert_allclose(runs["numba"].wall_impulse, runs["numpy"].wall_impulse)
+
+
+def test_missing_numba_falls_back_to_numpy(monkeypatch):
+    monkeypatch.setattr(backends, "numba", None)
+    assert backends.get_backend("auto").name == "numpy"
+    with pytest.warns(RuntimeWarning):
+        assert backends.get_backend("numba").name == "numpy"
+
+
+def test_unknown_backend_is_an_error():
+    with pytest.raises(ValueError):
+        backends.get_backend("fortran")
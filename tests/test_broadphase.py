@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from symulator.broadphase import CellGrid, NeighbourList
+
+
+def random_positions(n, seed, width=800, height=600):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, width, n), rng.uniform(0, height, n)
+
+
+def as_set(i, j):
+    return set(zip(np.minimum(i, j).tolist(), np.maximum(i, j).tolist()))
+
+
+def test_pairs_cover_adjacent_cells_exactly_once():
+    x, y = random_positions(1500, seed=1)
+    grid = CellGrid(800, 600, 20).build(x, y)
+    i, j = grid.pairs()
+
+    gx, gy = grid.cell // grid.grid_h, grid.cell % grid.grid_h
+    near = (np.abs(gx[:, None] - gx[None, :]) <= 1) & (np.abs(gy[:, None] - gy[None, :]) <= 1)
+    a, b = np.nonzero(np.triu(near, 1))
+
+    assert len(i) == len(as_set(i, j))
+    assert as_set(i, j) == as_set(a, b)
+
+
+def test_periodic_pairs_wrap_around_the_edges():
+    x, y = random_positions(1500, seed=4)
+    grid = CellGrid(800, 600, 21, periodic=True).build(x, y)
+    assert grid.grid_w % 3 == 0 and grid.grid_h % 2 == 0 and grid.cell_w >= 21
+    i, j = grid.pairs()
+
+    gx, gy = grid.cell // grid.grid_h, grid.cell % grid.grid_h
+    ring_x = np.abs(gx[:, None] - gx[None, :])
+    ring_y = np.abs(gy[:, None] - gy[None, :])
+    near = ((np.minimum(ring_x, grid.grid_w - ring_x) <= 1)
+            & (np.minimum(ring_y, grid.grid_h - ring_y) <= 1))
+    a, b = np.nonzero(np.triu(near, 1))
+
+    assert len(i) == len(as_set(i, j))
+    assert as_set(i, j) == as_set(a, b)
+
+
+def test_cells_hold_their_particles():
+    x, y = random_positions(500, seed=2)
+    grid = CellGrid(800, 600, 20).build(x, y)
+    for c in np.flatnonzero(grid.counts()):
+        members = grid.order[grid.start[c]:grid.start[c + 1]]
+        assert np.all(grid.cell[members] == c)
+        assert np.all(np.diff(members) > 0)
+
+
+def test_neighbour_list_keeps_pairs_within_cutoff():
+    x, y = random_positions(1000, seed=3)
+    neighbours = NeighbourList(800, 600, radius=5, skin=4)
+    i, j = neighbours.pairs(x, y)
+
+    d2 = (x[:, None] - x[None, :]) ** 2 + (y[:, None] - y[None, :]) ** 2
+    a, b = np.nonzero(np.triu(d2 < 14 ** 2, 1))
+    assert as_set(a, b) <= as_set(i, j)
+
+
+def test_periodic_neighbour_list_sees_through_the_seam():
+    neighbours = NeighbourList(800, 600, radius=5, skin=4, periodic=True)
+    x, y = np.array([1.0, 798.0, 400.0]), np.array([300.0, 305.0, 1.0])
+    i, j = neighbours.pairs(x, y)
+    assert as_set(i, j) == {(0, 1)}
+    # wrapping around is no move, the list stays
+    assert not neighbours.needs_rebuild(np.array([799.5, 798.0, 400.0]), y)
+
+
+def test_neighbour_list_rejects_negative_skin():
+    with pytest.raises(ValueError):
+        NeighbourList(800, 600, radius=5, skin=-1)
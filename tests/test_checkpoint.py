@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from symulator.checkpoint import load_checkpoint, save_checkpoint
+from symulator.engine import Simulation
+from symulator.event_driven import EventDrivenSimulation
+
+
+@pytest.mark.parametrize("skin", [None, 20])
+def test_restored_run_continues_exactly(tmp_path, skin):
+    sim = Simulation(1500, 10, neighbour_skin=skin, track_collisions=True,
+                     rng=np.random.default_rng(5))
+    sim.step(7)
+    path = save_checkpoint(sim, tmp_path / "run_{step}.npz")
+    assert path.endswith("run_7.npz")
+    restored = load_checkpoint(path)
+    sim.step(15)
+    restored.step(15)
+    np.testing.assert_array_equal(restored.positions, sim.positions)
+    np.testing.assert_array_equal(restored.velocities, sim.velocities)
+    assert restored.step_count == sim.step_count and restored.time == sim.time
+    assert restored.energy_drift() == sim.energy_drift()
+    assert restored.rng.random() == sim.rng.random()
+    np.testing.assert_array_equal(restored.collision_stats.counts, sim.collision_stats.counts)
+    assert restored.collision_stats.time == sim.collision_stats.time
+
+
+def test_overrides_and_engine_kind(tmp_path):
+    sim = EventDrivenSimulation(200, 10, rng=np.random.default_rng(6)).step(3)
+    restored = load_checkpoint(save_checkpoint(sim, tmp_path / "ed.npz"), radius=5)
+    assert isinstance(restored, EventDrivenSimulation)
+    assert restored.time == sim.time
+    np.testing.assert_array_equal(restored.positions, sim.positions)
@@ -0,0 +1,43 @@
+import io
+
+import numpy as np
+import pytest
+
+from symulator.broadphase import CellGrid
+from symulator.event_driven import EventDrivenSimulation
+from symulator.profiling import StepProfiler
+
+
+def test_energy_is_conserved_and_overlaps_disappear():
+    sim = EventDrivenSimulation(500, 10, radius=2, rng=np.random.default_rng(1))
+    sim.step(100)
+    assert sim.energy_drift() == pytest.approx(0, abs=1e-9)
+
+    x, y = sim.particles.x, sim.particles.y
+    i, j = CellGrid(sim.width, sim.height, 8).build(x, y).pairs()
+    assert np.hypot(x[j] - x[i], y[j] - y[i]).min() > 4 - 1e-6
+    assert x.min() >= 2 - 1e-9 and x.max() <= sim.width - 2 + 1e-9
+
+
+def test_observables_report_events():
+    sim = EventDrivenSimulation(200, 10, rng=np.random.default_rng(2)).step(5)
+    obs = sim.observables()
+    assert obs["events"] >= obs["collisions"] > 0
+    assert obs["pairs_tested"] is None
+
+
+def test_rejects_displacement_tracking():
+    with pytest.raises(ValueError):
+        EventDrivenSimulation(100, 10, track_displacement=True)
+
+
+@pytest.mark.parametrize("option", [{"threads": 2}, {"profiler": StepProfiler(io.StringIO())}])
+def test_rejects_options_it_would_ignore(option):
+    with pytest.raises(ValueError):
+        EventDrivenSimulation(100, 10, **option)
+
+
+def test_rejects_other_backends():
+    pytest.importorskip("numba")
+    with pytest.raises(ValueError):
+        EventDrivenSimulation(100, 10, backend="numba")
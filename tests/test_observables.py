@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+from symulator.engine import Simulation
+from symulator.event_driven import EventDrivenSimulation
+from symulator.observables import (
+    CollisionStats, MeanSquaredDisplacement, PressureMeter, RadialDistribution, SpeedHistogram,
+    UnfoldedDisplacement, maxwell_boltzmann_2d)
+from symulator.particles import reflect_walls
+
+
+def test_expected_bins_integrate_the_distribution():
+    histogram = SpeedHistogram(20, bins=200)
+    expected = histogram.expected(kT=4.0)
+    assert expected.sum() * histogram.bin_width == pytest.approx(1)
+    centres = histogram.edges[:-1] + histogram.bin_width / 2
+    np.testing.assert_allclose(expected[:100], maxwell_boltzmann_2d(centres[:100], 4.0), atol=2e-3)
+
+
+def test_maxwell_boltzmann_sample_matches():
+    rng = np.random.default_rng(10)
+    kT = 3.0
+    # each velocity component of a 2D gas is normal with variance kT
+    speeds = np.hypot(*rng.normal(0, np.sqrt(kT), (2, 200_000)))
+    histogram = SpeedHistogram(15).update(speeds)
+    assert histogram.kT == pytest.approx(kT, rel=0.01)
+    assert histogram.deviation() < 0.01
+    # uniform speeds are far from it
+    assert SpeedHistogram(15).update(rng.uniform(1, 5, 200_000)).deviation() > 0.1
+
+
+def test_accumulates_and_clips_to_the_last_bin():
+    histogram = SpeedHistogram(10, bins=5)
+    histogram.update(np.array([0.5, 3.0, 50.0]))
+    histogram.update(np.array([9.9]))
+    assert histogram.total.tolist() == [1, 1, 0, 0, 2]
+    assert histogram.counts.tolist() == [0, 0, 0, 0, 1]
+    assert histogram.samples == 2
+
+
+def test_walls_receive_twice_the_normal_momentum():
+    x = np.array([-1.0, 5.0, 99.5, 50.0])
+    y = np.array([50.0, 50.0, 50.0, 101.0])
+    vx = np.array([-2.0, 3.0, 4.0, 1.0])
+    vy = np.array([0.5, 0.0, 0.0, 3.0])
+    impulse = np.zeros(4)
+    reflect_walls(x, y, vx, vy, 1.0, 100.0, 100.0, impulse)
+    np.testing.assert_allclose(impulse, [4.0, 8.0, 0.0, 6.0])
+    np.testing.assert_allclose(vx, [2.0, 3.0, -4.0, 1.0])
+
+
+def test_dilute_gas_is_ideal():
+    sim = Simulation(2000, 10, radius=0.5, rng=np.random.default_rng(11)).step(100)
+    meter = PressureMeter(sim, window=5)
+    assert meter.pressure() is None
+    for _ in range(5):
+        meter.sample()
+        sim.step(40)
+    meter.sample()
+    assert meter.compressibility() == pytest.approx(1, abs=0.03)
+    assert np.all(meter.wall_pressures() > 0)
+
+
+def test_rdf_counts_every_close_pair_once():
+    rng = np.random.default_rng(12)
+    x, y = rng.uniform(0, 200, 400), rng.uniform(0, 150, 400)
+    rdf = RadialDistribution(200, 150, 30, bins=15).update(x, y)
+    dist = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :])[np.triu_indices(400, 1)]
+    np.testing.assert_array_equal(rdf.counts, np.histogram(dist, bins=rdf.edges)[0])
+
+
+def test_rdf_of_uniform_points_is_one_in_a_finite_box():
+    rng = np.random.default_rng(13)
+    rdf = RadialDistribution(300, 200, 150, bins=10)
+    for _ in range(30):
+        rdf.update(rng.uniform(0, 300, 1000), rng.uniform(0, 200, 1000))
+    np.testing.assert_allclose(rdf.g(), 1, atol=0.02)
+
+
+def test_periodic_rdf_of_uniform_points_is_one():
+    rng = np.random.default_rng(22)
+    rdf = RadialDistribution(400, 300, 60, bins=12, periodic=True)
+    for _ in range(20):
+        rdf.update(rng.uniform(0, 400, 1000), rng.uniform(0, 300, 1000))
+    np.testing.assert_allclose(rdf.g(), 1, atol=0.05)
+
+
+def test_unfolded_displacement_ignores_the_walls():
+    sim = Simulation(1, 10, width=50, height=40, track_displacement=True,
+                     rng=np.random.default_rng(14))
+    vx, vy = sim.particles.vx[0], sim.particles.vy[0]
+    sim.step(300)
+    assert sim.unfolded.dx[0] == pytest.approx(vx * 300)
+    assert sim.unfolded.dy[0] == pytest.approx(vy * 300)
+
+
+def test_unfolded_displacement_follows_collisions_in_a_periodic_box():
+    sim = Simulation(400, 10, width=200, height=150, radius=3, periodic=True,
+                     track_displacement=True, placement="poisson", seed=17)
+    start = sim.positions.copy()
+    sim.step(200)
+    assert sim.collisions
+    moved = start + np.column_stack((sim.unfolded.dx, sim.unfolded.dy))
+    box = np.array([200.0, 150.0])
+    np.testing.assert_allclose((moved - sim.positions + box / 2) % box - box / 2, 0, atol=1e-6)
+
+
+class _Walk:
+    # stands in for a simulation, only what MeanSquaredDisplacement reads
+    def __init__(self, positions, time):
+        self.unfolded = UnfoldedDisplacement(positions.shape[0])
+        self.unfolded.dx[:], self.unfolded.dy[:] = positions.T
+        self.time = time
+
+
+def test_fft_msd_matches_the_direct_average():
+    rng = np.random.default_rng(15)
+    walk = np.cumsum(rng.normal(size=(70, 30, 2)), axis=0)
+    msd = MeanSquaredDisplacement(window=50)
+    for t in range(70):
+        msd.sample(_Walk(walk[t], float(t)))
+    r = walk[20:]  # the ring keeps the last 50 samples
+    direct = [np.mean(np.sum((r[lag:] - r[:50 - lag]) ** 2, axis=2)) for lag in range(50)]
+    np.testing.assert_allclose(msd.msd(), direct)
+    np.testing.assert_array_equal(msd.lags(), np.arange(50))
+    assert msd.diffusion() == pytest.approx(0.5, rel=0.3)  # unit steps per axis, 30 walkers
+
+
+def test_collision_counters_take_both_partners():
+    stats = CollisionStats(4)
+    stats.update(np.array([0, 0, 2]), np.array([1, 3, 3]), np.full(4, 2.0), 0.5)
+    np.testing.assert_array_equal(stats.counts, [2, 1, 1, 2])
+    assert stats.collision_rate() == pytest.approx(6 / (4 * 0.5))
+    assert stats.mean_free_path() == pytest.approx(4.0 / 6)
+    assert stats.free_paths()[1] == pytest.approx(1.0)
+
+
+def test_hard_disk_collision_rate_matches_kinetic_theory():
+    sim = EventDrivenSimulation(800, 10, radius=2, track_collisions=True,
+                                rng=np.random.default_rng(16))
+    sim.step(400)
+    rate, path = sim.collision_stats.expected(sim)
+    assert sim.collision_stats.collision_rate() == pytest.approx(rate, rel=0.1)
+    assert sim.collision_stats.mean_free_path() == pytest.approx(path, rel=0.1)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from symulator.engine import Simulation
+from symulator.parallel import ParallelSimulation
+
+
+def copy_state(source, target):
+    for name in ("x", "y", "vx", "vy"):
+        getattr(target.particles, name)[:] = getattr(source.particles, name)
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_strips_see_the_same_pairs_as_the_serial_grid(workers):
+    with ParallelSimulation(4000, 10, workers=workers, width=1200, height=900,
+                            rng=np.random.default_rng(1)) as sim:
+        sim.step(10)
+        serial = Simulation(4000, 10, width=1200, height=900)
+        copy_state(sim, serial)
+        sim.step()
+        serial.step()
+        assert sim.pairs_tested == serial.pairs_tested
+        assert sim.energy_drift() == pytest.approx(0, abs=1e-8)
+
+
+def test_runs_are_repeatable():
+    def run():
+        with ParallelSimulation(2000, 10, workers=3, rng=np.random.default_rng(5)) as sim:
+            sim.step(20)
+            return sim.positions
+
+    np.testing.assert_array_equal(run(), run())
+
+
+def test_rejects_other_backends():
+    pytest.importorskip("numba")
+    with pytest.raises(ValueError):
+        ParallelSimulation(100, 10, workers=2, backend="numba")
+
+
+def test_rejects_displacement_tracking():
+    with pytest.raises(ValueError):
+        ParallelSimulation(100, 10, workers=2, track_displacement=True)
+
+
+def test_rejects_collision_counters():
+    with pytest.raises(ValueError):
+        ParallelSimulation(100, 10, workers=2, track_collisions=True)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from symulator.broadphase import CellGrid
+from symulator.engine import Simulation
+from symulator.particles import ParticleSystem, resolve_pairs
+
+
+def crowded_system(seed):
+    return ParticleSystem.random(2000, 10, rng=np.random.default_rng(seed))
+
+
+def test_resolve_pairs_matches_sequential_collide_with():
+    system = crowded_system(seed=3)
+    reference = ParticleSystem.from_arrays(system.x, system.y, system.vx, system.vy)
+    i, j = CellGrid().build(system.x, system.y).pairs()
+
+    # resolve_pairs drops pairs that do not overlap on entry
+    overlapping = (system.x[j] - system.x[i]) ** 2 + (system.y[j] - system.y[i]) ** 2 < 100
+    hit_i, _ = system.collide_pairs(i, j)
+    for a, b in zip(i[overlapping], j[overlapping]):
+        reference[a].collide_with(reference[b])
+
+    assert len(hit_i) > 0
+    for name in ("x", "y", "vx", "vy"):
+        np.testing.assert_allclose(getattr(system, name), getattr(reference, name), atol=1e-12)
+
+
+def test_collisions_conserve_energy_and_momentum():
+    system = crowded_system(seed=4)
+    energy = system.kinetic_energy()
+    momentum = system.vx.sum(), system.vy.sum()
+    system.collide_pairs(*CellGrid().build(system.x, system.y).pairs())
+    assert system.kinetic_energy() == pytest.approx(energy, rel=1e-12)
+    assert (system.vx.sum(), system.vy.sum()) == pytest.approx(momentum, abs=1e-9)
+
+
+def test_only_approaching_particles_bounce():
+    system = ParticleSystem.from_arrays([100.0, 108.0, 300.0, 308.0], [100.0] * 4,
+                                        [1.0, -1.0, -1.0, 1.0], [0.0] * 4)
+    hit_i, hit_j = system.collide_pairs(np.array([0, 2]), np.array([1, 3]))
+    assert hit_i.tolist() == [0] and hit_j.tolist() == [1]
+    assert system.vx.tolist() == [-1.0, 1.0, -1.0, 1.0]
+
+
+def test_self_pairs_are_rejected():
+    system = crowded_system(seed=5)
+    with pytest.raises(ValueError):
+        resolve_pairs(system.x, system.y, system.vx, system.vy,
+                      np.array([1]), np.array([1]), system.radius)
+
+
+def test_pairs_collide_across_the_periodic_seam():
+    system = ParticleSystem.from_arrays([796.0, 2.0], [300.0, 300.0], [1.0, -1.0], [0.0, 0.0])
+    i, j = np.array([0]), np.array([1])
+    assert len(system.collide_pairs(i, j)[0]) == 0  # 794 apart with walls
+    hit_i, _ = resolve_pairs(system.x, system.y, system.vx, system.vy, i, j, system.radius,
+                             box=(800, 600))
+    assert hit_i.tolist() == [0]
+    assert system.vx.tolist() == [-1.0, 1.0]
+    assert system.x.tolist() == [794.0, 4.0]  # moved apart through the seam
+
+
+def test_periodic_box_conserves_momentum():
+    sim = Simulation(2000, 10, periodic=True, placement="poisson", rng=np.random.default_rng(6))
+    momentum = sim.momentum()
+    sim.step(50)
+    assert sim.momentum() == pytest.approx(momentum, abs=1e-9)
+    assert sim.energy_drift() == pytest.approx(0, abs=1e-8)
+    x, y = sim.particles.x, sim.particles.y
+    assert x.min() >= 0 and x.max() <= 800 and y.min() >= 0 and y.max() <= 600
+    assert sim.collisions > 0 and not sim.wall_impulse.any()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from symulator.broadphase import CellGrid
+from symulator.engine import Simulation
+from symulator.placement import hex_lattice, poisson_disc, square_lattice
+
+
+def closest_pair(x, y, radius, width, height):
+    i, j = CellGrid(width, height, 4 * radius).build(x, y).pairs()
+    return np.sqrt(((x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2).min(initial=np.inf))
+
+
+def test_poisson_disc_does_not_overlap():
+    x, y = poisson_disc(2000, 800, 600, 5, np.random.default_rng(17))
+    assert len(x) == 2000
+    assert closest_pair(x, y, 5, 800, 600) >= 10 - 1e-9
+    assert x.min() >= 5 and x.max() <= 795 and y.min() >= 5 and y.max() <= 595
+
+
+def test_dilute_poisson_disc_places_only_what_is_asked():
+    x, y = poisson_disc(1000, 2000, 2000, 1, np.random.default_rng(23))
+    assert len(x) == 1000
+    assert closest_pair(x, y, 1, 2000, 2000) >= 2 - 1e-9
+    assert x.min() >= 1 and x.max() <= 1999 and y.min() >= 1 and y.max() <= 1999
+
+
+def test_poisson_disc_spreads_over_the_box():
+    x, y = poisson_disc(1000, 800, 600, 5, np.random.default_rng(18))
+    counts, _, _ = np.histogram2d(x, y, bins=4, range=((0, 800), (0, 600)))
+    assert counts.min() > 0.6 * counts.mean()
+
+
+@pytest.mark.parametrize("place, fraction", [(square_lattice, 0.75), (hex_lattice, 0.88)])
+def test_lattices_fit_dense_systems(place, fraction):
+    n = int(fraction * 800 * 600 / (np.pi * 25))
+    x, y = place(n, 800, 600, 5, np.random.default_rng(19))
+    assert len(np.unique(np.column_stack((x, y)), axis=0)) == n
+    assert closest_pair(x, y, 5, 800, 600) >= 10 - 1e-9
+    assert x.min() >= 5 and x.max() <= 795 and y.min() >= 5 and y.max() <= 595
+
+
+def test_too_dense_is_an_error():
+    with pytest.raises(ValueError):
+        poisson_disc(4000, 800, 600, 5, np.random.default_rng(20))
+    with pytest.raises(ValueError):
+        hex_lattice(5600, 800, 600, 5, np.random.default_rng(20))
+
+
+def test_simulation_starts_without_overlaps():
+    sim = Simulation(3000, 10, placement="auto", rng=np.random.default_rng(21))
+    p = sim.particles
+    assert closest_pair(p.x, p.y, sim.radius, sim.width, sim.height) >= 2 * sim.radius - 1e-9
+    assert sim.parameters()["placement"] == "auto"
+    with pytest.raises(ValueError):
+        Simulation(10, 10, placement="grid")
@@ -0,0 +1,37 @@
+import csv
+import io
+import json
+
+import numpy as np
+
+from symulator.engine import Simulation
+from symulator.profiling import FIELDS, StepProfiler
+
+
+def test_one_row_per_step_with_counts():
+    stream = io.StringIO()
+    with Simulation(1000, 10, rng=np.random.default_rng(4), profiler=StepProfiler(stream)) as sim:
+        sim.step(3)
+        collisions = sim.collisions
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert [int(row["step"]) for row in rows] == [1, 2, 3]
+    assert tuple(rows[0]) == FIELDS
+    assert int(rows[-1]["collisions"]) == collisions
+    assert all(int(row["grid_ns"]) > 0 for row in rows)
+    # every particle sits in one of the occupied cells
+    last = rows[-1]
+    assert float(last["mean_per_cell"]) * int(last["occupied_cells"]) == 1000
+
+
+def test_viewer_phases_land_in_the_open_row():
+    stream = io.StringIO()
+    profiler = StepProfiler(stream, fmt="json")
+    sim = Simulation(100, 10, profiler=profiler)
+    sim.step()
+    profiler.resume()
+    profiler.mark("draw")
+    sim.step()
+    row = json.loads(stream.getvalue().splitlines()[0])
+    assert row["step"] == 1 and row["draw_ns"] > 0
+    assert profiler.last == row
+    assert len(profiler.summary()) == 3
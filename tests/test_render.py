@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+pygame = pytest.importorskip("pygame")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from symulator.render import (  # noqa: E402
+    HeatmapRenderer, SpriteRenderer, make_renderer, speed_colour_values)
+
+
+def test_sprites_match_draw_circle():
+    rng = np.random.default_rng(3)
+    x = rng.uniform(10, 190, 200)
+    y = rng.uniform(10, 140, 200)
+    speeds = rng.uniform(0, 10, 200)
+
+    expected = pygame.Surface((200, 150))
+    expected.fill((255, 255, 255))
+    for px, py, c in zip(x.astype(int), y.astype(int), speed_colour_values(speeds)):
+        pygame.draw.circle(expected, (int(c), 0, 255 - int(c)), (int(px), int(py)), 5)
+
+    actual = pygame.Surface((200, 150))
+    actual.fill((255, 255, 255))
+    SpriteRenderer(radius=5).draw(actual, x, y, speeds)
+    assert pygame.image.tobytes(actual, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+
+def test_heatmap_bins_into_grid_cells():
+    x = np.array([5.0, 6.0, 25.0, 95.0])
+    y = np.array([5.0, 7.0, 5.0, 55.0])
+    speeds = np.array([1.0, 3.0, 10.0, 2.0])
+    heatmap = HeatmapRenderer(100, 60, cell_size=20)
+    density = heatmap.colour_values(x, y, speeds)
+    assert density.shape == (5, 3)
+    assert density[0, 0] == 255 and density[1, 0] == 127 and density[4, 2] == 127
+    assert (density == -1).sum() == 12  # empty cells
+    heatmap.toggle()
+    speed = heatmap.colour_values(x, y, speeds)
+    assert speed[0, 0] == 80 and speed[1, 0] == 255 and speed[4, 2] == 80
+
+
+def test_renderer_switches_above_threshold():
+    assert isinstance(make_renderer(1000, threshold=5000), SpriteRenderer)
+    heatmap = make_renderer(10000, threshold=5000)
+    assert isinstance(heatmap, HeatmapRenderer)
+    screen = pygame.Surface((800, 600))
+    rng = np.random.default_rng(0)
+    heatmap.draw(screen, rng.uniform(0, 800, 10000), rng.uniform(0, 600, 10000), rng.uniform(0, 10, 10000))
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from symulator.engine import Simulation
+from symulator.replay import ReplayCursor
+from symulator.trajectory import Trajectory, TrajectoryWriter
+
+
+@pytest.fixture
+def trajectory(tmp_path):
+    sim = Simulation(200, 10, rng=np.random.default_rng(9))
+    with TrajectoryWriter(tmp_path / "run.traj", sim, capacity=10) as writer:
+        for _ in range(10):
+            writer.record(sim)
+            sim.step()
+    return Trajectory(tmp_path / "run.traj")
+
+
+def test_play_speed_and_end(trajectory):
+    cursor = ReplayCursor(trajectory)
+    assert cursor.advance() == 1
+    cursor.faster()
+    assert cursor.speed == 2 and cursor.advance() == 3
+    cursor.slower()
+    cursor.slower()
+    assert cursor.advance() == 3  # half a frame per displayed frame
+    assert cursor.advance() == 4
+    cursor.faster()
+    cursor.faster()
+    cursor.faster()
+    for _ in range(5):
+        cursor.advance()
+    assert cursor.index == 9 and cursor.paused
+    cursor.toggle_pause()
+    assert cursor.index == 0 and not cursor.paused
+
+
+def test_seek_and_frame(trajectory):
+    cursor = ReplayCursor(trajectory)
+    cursor.seek_fraction(0.5)
+    assert cursor.index == 4
+    cursor.seek(100)
+    assert cursor.index == 9
+    cursor.paused = True
+    assert cursor.advance() == 9
+    x, y, speeds = cursor.frame()
+    _, _, vx, vy = trajectory[9]
+    np.testing.assert_array_equal(speeds, np.hypot(vx, vy))
+    assert cursor.energy() == pytest.approx(0.5 * np.sum(speeds.astype(np.float64) ** 2))
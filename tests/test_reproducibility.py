@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from symulator.engine import Simulation
+from symulator.event_driven import EventDrivenSimulation
+from symulator.parallel import ParallelSimulation
+
+CONFIGS = {
+    "numpy": (Simulation, {}),
+    "numba": (Simulation, {"backend": "numba"}),
+    "threads": (Simulation, {"threads": 3}),
+    "neighbour_list": (Simulation, {"neighbour_skin": 25}),
+    "periodic": (Simulation, {"periodic": True, "placement": "poisson"}),
+    "event_driven": (EventDrivenSimulation, {"radius": 3}),
+    "parallel": (ParallelSimulation, {"workers": 2}),
+}
+
+
+def run(config, seed, steps=25):
+    cls, kwargs = CONFIGS[config]
+    if kwargs.get("backend") == "numba":
+        pytest.importorskip("numba")
+    with cls(1500, 10, seed=seed, **kwargs) as sim:
+        sim.step(steps)
+        return ([getattr(sim.particles, name).copy() for name in ("x", "y", "vx", "vy")]
+                + [sim.wall_impulse.copy()])
+
+
+@pytest.mark.parametrize("config", sorted(CONFIGS))
+def test_same_seed_repeats_the_run_bit_for_bit(config):
+    first, second = run(config, seed=2024), run(config, seed=2024)
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a, b)
+    other = run(config, seed=2025)
+    assert not np.array_equal(first[0], other[0])
+
+
+def test_seed_and_rng_are_exclusive():
+    with pytest.raises(ValueError):
+        Simulation(10, 10, seed=1, rng=np.random.default_rng(1))
+    assert Simulation(10, 10, seed=7).parameters()["seed"] == 7
@@ -0,0 +1,42 @@
+import time
+
+import numpy as np
+import pytest
+
+from symulator.engine import Simulation
+from symulator.ring import FrameRing, PhysicsProcess
+
+
+def test_latest_is_the_newest_frame_and_a_view():
+    sim = Simulation(500, 10, rng=np.random.default_rng(2))
+    ring = FrameRing(len(sim), slots=3)
+    try:
+        assert ring.latest() is None
+        for _ in range(5):
+            sim.step()
+            ring.write(sim)
+        frame = ring.latest()
+        assert frame.step == 5
+        np.testing.assert_allclose(frame.x, sim.particles.x, rtol=1e-6)
+        np.testing.assert_allclose(frame.speeds, sim.speeds(), rtol=1e-6)
+        assert np.shares_memory(frame.x, ring.data)
+        assert frame.intact()
+        # the writer does not wait, it comes around to the slot again
+        for _ in range(3):
+            ring.write(sim)
+        assert not frame.intact()
+    finally:
+        ring.close()
+
+
+def test_physics_process_publishes_frames():
+    physics = PhysicsProcess(1000, 10, steps_per_frame=2)
+    try:
+        deadline = time.monotonic() + 20
+        while (frame := physics.latest()) is None or frame.step < 6:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert frame.step % 2 == 0
+        assert frame.energy == pytest.approx(physics.initial_energy)
+    finally:
+        physics.stop()
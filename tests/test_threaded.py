@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+import pytest
+
+from symulator.engine import Simulation
+from symulator.threaded import PhysicsThread
+
+
+def test_snapshots_are_whole_batches():
+    sim = Simulation(2000, 10, rng=np.random.default_rng(1))
+    physics = PhysicsThread(sim, steps_per_frame=3)
+    physics.start()
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            with physics.latest() as snapshot:
+                step = snapshot.step
+                if step >= 9:
+                    assert snapshot.energy == pytest.approx(sim.initial_energy)
+                    # speeds and energy come from the same batch
+                    assert 0.5 * np.sum(snapshot.speeds ** 2) == pytest.approx(snapshot.energy)
+                    break
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        physics.stop()
+    assert step % 3 == 0
+
+
+def test_rate_limits_the_batches():
+    sim = Simulation(100, 10, rng=np.random.default_rng(1))
+    physics = PhysicsThread(sim, rate=20)
+    physics.start()
+    time.sleep(0.5)
+    physics.stop()
+    assert 3 <= sim.step_count <= 13
+
+
+def test_errors_surface_on_stop():
+    sim = Simulation(100, 10)
+    sim.step = None  # not callable, the thread dies on the first batch
+    physics = PhysicsThread(sim)
+    physics.start()
+    with pytest.raises(RuntimeError):
+        physics.stop()
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from symulator.engine import Simulation
+
+
+def run(threads, steps=10, periodic=False):
+    with Simulation(6000, 10, width=1400, height=1000, threads=threads, periodic=periodic,
+                    rng=np.random.default_rng(3)) as sim:
+        sim.step(steps)
+        return sim
+
+
+@pytest.mark.parametrize("periodic", [False, True])
+def test_result_does_not_depend_on_thread_count(periodic):
+    two, five = run(2, periodic=periodic), run(5, periodic=periodic)
+    np.testing.assert_array_equal(two.positions, five.positions)
+    np.testing.assert_array_equal(two.velocities, five.velocities)
+    assert two.energy_drift() == pytest.approx(0, abs=1e-8)
+
+
+@pytest.mark.parametrize("periodic", [False, True])
+def test_colours_never_share_a_stencil_cell(periodic):
+    grid = Simulation(10, 10, periodic=periodic).grid
+    cells = np.arange(grid.num_cells)
+    gx, gy = cells // grid.grid_h, cells % grid.grid_h
+    colour = grid.colours(cells)
+    same = colour[:, None] == colour[None, :]
+    np.fill_diagonal(same, False)
+    # stencils span columns gx-1..gx+1 and rows gy-1..gy, around the seam too
+    dx = np.abs(gx[:, None] - gx[None, :])
+    dy = np.abs(gy[:, None] - gy[None, :])
+    if periodic:
+        dx, dy = np.minimum(dx, grid.grid_w - dx), np.minimum(dy, grid.grid_h - dy)
+    overlap = (dx <= 2) & (dy <= 1)
+    assert not np.any(same & overlap)
+
+
+def test_threads_need_the_cell_grid():
+    with pytest.raises(ValueError):
+        Simulation(100, 10, neighbour_skin=2, threads=2)
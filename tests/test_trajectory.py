@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from symulator.engine import Simulation
+from symulator.trajectory import Trajectory, TrajectoryWriter
+
+
+def test_frames_round_trip(tmp_path):
+    path = tmp_path / "run.traj"
+    sim = Simulation(300, 10, rng=np.random.default_rng(8))
+    expected = []
+    with TrajectoryWriter(path, sim, capacity=6, stride=2, buffers=2) as writer:
+        for _ in range(5):
+            sim.step(2)
+            writer.record(sim)
+            expected.append(sim.velocities.astype(np.float32))
+    trajectory = Trajectory(path)
+    assert len(trajectory) == 5 and trajectory.capacity == 6
+    assert (trajectory.num_particles, trajectory.stride, trajectory.dt) == (300, 2, sim.dt)
+    assert [trajectory.step_of(k) for k in range(5)] == [2, 4, 6, 8, 10]
+    for frame, velocities in zip(trajectory, expected):
+        np.testing.assert_array_equal(np.column_stack(frame[2:]), velocities)
+    with pytest.raises(IndexError):
+        trajectory[5]
+
+
+def test_full_trajectory_refuses_frames(tmp_path):
+    sim = Simulation(10, 10)
+    with TrajectoryWriter(tmp_path / "small.traj", sim, capacity=1) as writer:
+        writer.record(sim)
+        with pytest.raises(RuntimeError):
+            writer.record(sim)